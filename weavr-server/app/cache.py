@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Optional, Set, Tuple
+
+from app.config import settings
+
+PairKey = Tuple[int, int]
+
+
+# --- Connection Strength Cache ---
+class StrengthCache:
+    """
+    Bounded LRU cache of connection strengths keyed by (user1_id, user2_id).
+    A per-user key index lets a write evict only the pairs that involve the affected user.
+    The cache is process-local, so a write only evicts entries in its own worker; entries expire
+    after ttl_seconds, which bounds how long other workers serve a stale strength.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[PairKey, Tuple[int, float]]" = OrderedDict()  # key -> (strength, expires at)
+        self._keys_by_user: Dict[int, Set[PairKey]] = defaultdict(set)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, user1_id: int, user2_id: int) -> Optional[int]:
+        key = (user1_id, user2_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                del self._entries[key]
+                self._forget(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            strength = entry[0]
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return strength
+
+    def set(self, user1_id: int, user2_id: int, strength: int) -> None:
+        if self.max_size <= 0:
+            return
+        key = (user1_id, user2_id)
+        with self._lock:
+            self._entries[key] = (strength, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            self._keys_by_user[user1_id].add(key)
+            self._keys_by_user[user2_id].add(key)
+            while len(self._entries) > self.max_size:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._forget(evicted_key)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for key in self._keys_by_user.pop(user_id, set()):
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+                self._forget(key)
+
+    def _forget(self, key: PairKey) -> None:
+        for user_id in key:
+            keys = self._keys_by_user.get(user_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_user[user_id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+strength_cache = StrengthCache(settings.STRENGTH_CACHE_SIZE, settings.STRENGTH_CACHE_TTL_SECONDS)
@@ -1,11 +1,142 @@
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import Executable, func, inspect, select, text
+from sqlalchemy.exc import DBAPIError
+
+from app.crud import connection_strength_update
 from app.database import engine
 from app.models import (
     Base, User, Goal, Connection, Introduction, Group, GroupMembership, Badge, Leaderboard,
     LeaderboardEntry, WeavrWisdom, Event, Notification, Message, Post, Comment,
-    Like, UserSettings, Feedback, Report, NotificationSettings, UserActivity, UserPoints, Passion
+    Like, UserSettings, Feedback, Report, NotificationSettings, UserActivity, UserPoints, Passion, MutualConnection,
+    NotificationCounter, TimelineEntry, FanoutOnReadAuthor, SchemaVersion, SCHEMA_VERSION
 )
 
 
+# --- Migrations ---
+# create_all only creates missing tables, so every column added to an existing table is listed here under the
+# version that added it, as (table, column definition). A column that already exists is skipped, so a
+# migration interrupted on a database without transactional DDL can be run again.
+ADDED_COLUMNS: Dict[int, List[Tuple[str, str]]] = {
+    6: [
+        ("posts", "like_count INTEGER DEFAULT 0 NOT NULL"),
+        ("posts", "comment_count INTEGER DEFAULT 0 NOT NULL"),
+        ("comments", "like_count INTEGER DEFAULT 0 NOT NULL"),
+    ],
+    8: [
+        # Existing comments are all top-level, so NULL parents and no replies are correct without a backfill
+        ("comments", "parent_id INTEGER REFERENCES comments (id) ON DELETE CASCADE"),
+        ("comments", "reply_count INTEGER DEFAULT 0 NOT NULL"),
+    ],
+}
+
+_RECOUNT_POST_LIKES = "UPDATE posts SET like_count = (SELECT count(*) FROM likes WHERE likes.post_id = posts.id)"
+_RECOUNT_COMMENT_LIKES = ("UPDATE comments SET like_count = "
+                          "(SELECT count(*) FROM likes WHERE likes.comment_id = comments.id)")
+
+# Rows without an id column are told apart by the dialect's physical row identifier
+_ROW_IDS = {"sqlite": "rowid", "postgresql": "ctid"}
+
+
+def _delete_duplicates(table: str, *key: str) -> Callable[[str], str]:
+    # Keep the first row of each key; the rest share the key with an earlier row
+    same_key = " AND ".join(f"earlier.{column} = {table}.{column}" for column in key)
+    return lambda dialect: (f"DELETE FROM {table} WHERE EXISTS (SELECT 1 FROM {table} AS earlier WHERE {same_key} "
+                            f"AND earlier.{_ROW_IDS[dialect]} < {table}.{_ROW_IDS[dialect]})")
+
+
+# Statements run after a version's columns are added and before missing indexes are created, e.g. to
+# backfill columns or clean up rows a new unique index would reject. Each must be safe to repeat. A callable
+# is given the dialect name and returns the SQL to run.
+BACKFILLS: Dict[int, List[Union[str, Executable, Callable[[str], str]]]] = {
+    3: [
+        # Keep one row per key, so the unique passion and attendee indexes can be built
+        _delete_duplicates("user_passions", "user_id", "passion_id"),
+        _delete_duplicates("event_attendees", "event_id", "user_id"),
+    ],
+    6: [
+        _RECOUNT_POST_LIKES,
+        "UPDATE posts SET comment_count = (SELECT count(*) FROM comments WHERE comments.post_id = posts.id)",
+        _RECOUNT_COMMENT_LIKES,
+    ],
+    7: [
+        # Keep the first like of each user and target, so the unique like indexes can be built
+        "DELETE FROM likes WHERE id NOT IN (SELECT min(id) FROM likes GROUP BY user_id, post_id, comment_id)",
+        _RECOUNT_POST_LIKES,
+        _RECOUNT_COMMENT_LIKES,
+        # Replaced by the unique like indexes
+        "DROP INDEX IF EXISTS like_user_post_idx",
+        "DROP INDEX IF EXISTS like_user_comment_idx",
+    ],
+    9: [
+        # Connection strength stops being client-set
+        connection_strength_update(),
+    ],
+}
+
+
+def _installed_version(sync_conn) -> Optional[int]:
+    # None for an empty database, which create_all builds at SCHEMA_VERSION; 0 for tables that predate versioning
+    inspector = inspect(sync_conn)
+    version = None
+    if inspector.has_table(SchemaVersion.__tablename__):
+        version = sync_conn.scalar(select(func.max(SchemaVersion.version)))
+    if version is None and inspector.has_table(User.__tablename__):
+        version = 0
+    return version
+
+
+def _migrate(sync_conn, installed: int):
+    for version in range(installed + 1, SCHEMA_VERSION + 1):
+        for table, column in ADDED_COLUMNS.get(version, []):
+            existing = {c["name"] for c in inspect(sync_conn).get_columns(table)}
+            if column.split()[0] not in existing:
+                sync_conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column}"))
+        for statement in BACKFILLS.get(version, []):
+            if callable(statement):
+                statement = statement(sync_conn.dialect.name)
+            sync_conn.execute(text(statement) if isinstance(statement, str) else statement)
+
+
+def _create_missing_indexes(sync_conn):
+    # create_all only builds indexes together with new tables, so indexes added to existing tables need this
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
 async def create_database():
+    """
+    Create any missing tables, migrate from the stored version, create missing indexes
+    and record SCHEMA_VERSION, in one transaction. Run once per deploy, not on every worker start.
+    """
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        installed = await conn.run_sync(_installed_version)
+        await conn.run_sync(Base.metadata.create_all)
+        if installed is not None:
+            await conn.run_sync(_migrate, installed)
+        # After the migrations, since new indexes may cover migrated columns
+        await conn.run_sync(_create_missing_indexes)
+        if await conn.scalar(select(SchemaVersion.version).where(SchemaVersion.version == SCHEMA_VERSION)) is None:
+            await conn.execute(SchemaVersion.__table__.insert().values(version=SCHEMA_VERSION))
+
+
+async def get_schema_version():
+    """
+    The newest schema version recorded in the database, or None if it has never been created.
+    """
+    async with engine.connect() as conn:
+        try:
+            return await conn.scalar(select(func.max(SchemaVersion.version)))
+        except DBAPIError:
+            return None  # No schema_version table yet
+
+
+async def check_schema_version():
+    """
+    Verify the stored schema version with a single query instead of running DDL on startup.
+    """
+    version = await get_schema_version()
+    if version != SCHEMA_VERSION:
+        raise RuntimeError(f"Database schema version is {version}, expected {SCHEMA_VERSION}. "
+                           f"Run `python -m app.maintenance create-tables` to migrate it.")
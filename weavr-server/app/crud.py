@@ -1,17 +1,29 @@
-from typing import List, Optional, Type
-
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Type
+
+from sqlalchemy import (
+    DateTime, Integer, and_, case, delete, distinct, exists, func, insert, literal, or_, select, tuple_, union,
+    union_all, update
+)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import aliased
 
+from app.cache import strength_cache
+from app.config import settings
+from app.database import dialect_insert
 from app.models import (User, Goal, Introduction, Group, GroupMembership, Badge, Leaderboard,
                         LeaderboardEntry, WeavrWisdom, Event, Notification, Message, Post,
                         Comment, Like, UserSettings, Feedback, Report, NotificationSettings,
-                        Connection)
+                        Connection, MutualConnection, NotificationCounter, TimelineEntry, FanoutOnReadAuthor,
+                        GoalType, Passion, user_passions, event_attendees)
 from app.schemas import (UserCreate, UserUpdate, GoalCreate, IntroductionCreate, GroupCreate,
                          GroupMembershipCreate, BadgeCreate, LeaderboardCreate, LeaderboardEntryCreate,
                          WeavrWisdomCreate, EventCreate, NotificationCreate, MessageCreate, PostCreate,
                          CommentCreate, LikeCreate, UserSettingsCreate, FeedbackCreate, ReportCreate,
-                         NotificationSettingsCreate, ConnectionCreate)
+                         NotificationSettingsCreate, ConnectionCreate, UserPassionCreate, EventAttendeeCreate)
+from app.network import adjacency_index
+from app.pagination import Page, decode_cursor, encode_cursor, fetch_page
 
 
 # --- User CRUD operations ---
@@ -23,629 +35,1353 @@ async def create_user(db: AsyncSession, user_create: UserCreate) -> User:
     return db_user
 
 
-def get_user(db: Session, user_id: int) -> Optional[User]:
-    return db.query(User).filter(User.id == user_id).first()
+async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    return await db.scalar(select(User).where(User.id == user_id))
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 10) -> list[Type[User]]:
-    return db.query(User).offset(skip).limit(limit).all()
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 10) -> list[Type[User]]:
+    return (await db.scalars(select(User).offset(skip).limit(limit))).all()
 
 
-def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[User]:
-    db_user = db.query(User).filter(User.id == user_id).first()
+async def update_user(db: AsyncSession, user_id: int, user_update: UserUpdate) -> Optional[User]:
+    db_user = await db.scalar(select(User).where(User.id == user_id))
     if db_user:
         for key, value in user_update.dict(exclude_unset=True).items():  # Exclude unset values
             setattr(db_user, key, value)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
     return db_user
 
 
-def delete_user(db: Session, user_id: int) -> Optional[User]:
-    db_user = db.query(User).filter(User.id == user_id).first()
+async def delete_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    db_user = await db.scalar(select(User).where(User.id == user_id))
     if db_user:
-        db.delete(db_user)
-        db.commit()
+        await db.delete(db_user)
+        await db.commit()
     return db_user
 
 
 # --- Goal CRUD operations ---
-def create_goal(db: Session, goal: GoalCreate, user_id: int) -> Goal:  # Need user_id
+async def create_goal(db: AsyncSession, goal: GoalCreate, user_id: int) -> Goal:  # Need user_id
     db_goal = Goal(**goal.dict(), user_id=user_id)
     db.add(db_goal)
-    db.commit()
-    db.refresh(db_goal)
+    await refresh_connection_strengths(db, [user_id])
+    await db.commit()
+    await db.refresh(db_goal)
+    strength_cache.invalidate_user(db_goal.user_id)
     return db_goal
 
 
-def get_goal(db: Session, goal_id: int) -> Optional[Goal]:
-    return db.query(Goal).filter(Goal.id == goal_id).first()
+async def get_goal(db: AsyncSession, goal_id: int) -> Optional[Goal]:
+    return await db.scalar(select(Goal).where(Goal.id == goal_id))
 
 
-def get_goals_by_user(db: Session, user_id: int) -> List[Goal]:
-    return db.query(Goal).filter(Goal.user_id == user_id).all()
+async def get_goals_by_user(db: AsyncSession, user_id: int) -> List[Goal]:
+    return (await db.scalars(select(Goal).where(Goal.user_id == user_id))).all()
 
 
-def update_goal(db: Session, goal_id: int, goal_update: GoalCreate) -> Optional[Goal]:
-    db_goal = db.query(Goal).filter(Goal.id == goal_id).first()
+async def update_goal(db: AsyncSession, goal_id: int, goal_update: GoalCreate) -> Optional[Goal]:
+    db_goal = await db.scalar(select(Goal).where(Goal.id == goal_id))
     if db_goal:
+        previous_user_id = db_goal.user_id
+        strength_cache.invalidate_user(previous_user_id)
         for key, value in goal_update.dict(exclude_unset=True).items():
             setattr(db_goal, key, value)
-        db.commit()
-        db.refresh(db_goal)
+        await refresh_connection_strengths(db, {previous_user_id, db_goal.user_id})
+        await db.commit()
+        await db.refresh(db_goal)
+        strength_cache.invalidate_user(db_goal.user_id)
     return db_goal
 
 
-def delete_goal(db: Session, goal_id: int) -> Optional[Goal]:
-    db_goal = db.query(Goal).filter(Goal.id == goal_id).first()
+async def delete_goal(db: AsyncSession, goal_id: int) -> Optional[Goal]:
+    db_goal = await db.scalar(select(Goal).where(Goal.id == goal_id))
     if db_goal:
-        db.delete(db_goal)
-        db.commit()
+        await db.delete(db_goal)
+        await refresh_connection_strengths(db, [db_goal.user_id])
+        await db.commit()
+        strength_cache.invalidate_user(db_goal.user_id)
     return db_goal
 
 
 # --- Connection CRUD Operations ---
-def create_connection(db: Session, connection: ConnectionCreate) -> Connection:
+async def create_connection(db: AsyncSession, connection: ConnectionCreate) -> Connection:
     db_connection = Connection(**connection.dict())
+    await lock_connection_writes(db)
+    if await get_connection(db, db_connection.connected_user_id, db_connection.user_id) is None:
+        await apply_mutual_connection_delta(db, db_connection.user_id, db_connection.connected_user_id, 1)
     db.add(db_connection)
-    db.commit()
-    db.refresh(db_connection)
+    # Strength is computed, never taken from the client
+    await refresh_connection_strengths(db, [db_connection.user_id])
+    await db.commit()
+    await db.refresh(db_connection)
+    adjacency_index.add_edge(db_connection.user_id, db_connection.connected_user_id)
+    strength_cache.invalidate_user(db_connection.user_id)
+    strength_cache.invalidate_user(db_connection.connected_user_id)
     return db_connection
 
 
-def get_connection(db: Session, user_id: int, connected_user_id: int) -> Optional[Connection]:
-    return db.query(Connection).filter(Connection.user_id == user_id,
-                                       Connection.connected_user_id == connected_user_id).first()
-
-
-def get_connections_for_user(db: Session, user_id: int) -> List[Connection]:
-    return db.query(Connection).filter(
-        (Connection.user_id == user_id) | (Connection.connected_user_id == user_id)).all()
-
-
-def update_connection(db: Session, user_id: int, connected_user_id: int, connection_update: ConnectionCreate) -> \
-        Optional[Connection]:
-    db_connection = get_connection(db, user_id, connected_user_id)
+async def get_connection(db: AsyncSession, user_id: int, connected_user_id: int) -> Optional[Connection]:
+    return await db.scalar(select(Connection).where(Connection.user_id == user_id,
+                                                    Connection.connected_user_id == connected_user_id))
+
+
+async def get_connections_for_user(db: AsyncSession, user_id: int) -> List[Connection]:
+    return (await db.scalars(select(Connection).where(
+        (Connection.user_id == user_id) | (Connection.connected_user_id == user_id)))).all()
+
+
+async def get_strong_contact_ids(db: AsyncSession, user_id: int, min_strength: int,
+                                 among: Optional[List[int]] = None) -> Set[int]:
+    """
+    Ids of users connected to user_id (in either direction) with a stored connection_strength of at least
+    min_strength, optionally restricted to the users in among. One indexed read.
+    """
+    stmt = select(Connection.user_id, Connection.connected_user_id).where(
+        (Connection.user_id == user_id) | (Connection.connected_user_id == user_id),
+        Connection.connection_strength >= min_strength)
+    if among is not None:
+        stmt = stmt.where(Connection.user_id.in_(among) | Connection.connected_user_id.in_(among))
+    contact_ids = {connected_user_id if owner_id == user_id else owner_id
+                   for owner_id, connected_user_id in (await db.execute(stmt)).all()} - {user_id}
+    return contact_ids if among is None else contact_ids & set(among)
+
+
+async def get_connected_pairs(db: AsyncSession, user_ids: List[int]) -> Set[tuple[int, int]]:
+    """
+    Connections among user_ids, as ordered (smaller id, larger id) pairs.
+    """
+    rows = (await db.execute(select(Connection.user_id, Connection.connected_user_id).where(
+        Connection.user_id.in_(user_ids), Connection.connected_user_id.in_(user_ids)))).all()
+    return {_ordered_pair(user_id, connected_user_id) for user_id, connected_user_id in rows}
+
+
+def _reachability_levels(user_id: int, target_user_ids: List[int], max_depth: int):
+    """
+    One CTE per depth from 0 to max_depth, holding the users first reached at that depth from user_id.
+    Each level only expands the users new at the previous one, and is empty once every target is reached.
+    """
+    levels = [select(literal(user_id, Integer).label("user_id")).cte("depth_0")]
+    for depth in range(1, max_depth + 1):
+        previous = levels[-1]
+        reached = union_all(*(select(level.c.user_id) for level in levels)).subquery()
+        found = select(func.count(distinct(reached.c.user_id))).where(reached.c.user_id.in_(target_user_ids))
+        searching = found.scalar_subquery() < len(set(target_user_ids))
+        frontier = union(
+            select(Connection.connected_user_id.label("user_id"))
+            .join(previous, previous.c.user_id == Connection.user_id).where(searching),
+            select(Connection.user_id).join(previous, previous.c.user_id == Connection.connected_user_id)
+            .where(searching),
+        ).subquery()
+        new_users = select(frontier.c.user_id).where(frontier.c.user_id.not_in(select(reached.c.user_id)))
+        levels.append(new_users.cte(f"depth_{depth}"))
+    return union_all(*(select(level.c.user_id, literal(depth, Integer).label("depth"))
+                       for depth, level in enumerate(levels))).subquery("reach")
+
+
+async def get_degree_of_separation(db: AsyncSession, user_id: int, target_user_id: int,
+                                   max_depth: int = 3) -> Optional[int]:
+    """
+    Shortest hop count between two users, computed in a single query that expands one depth at a time.
+    Connections are followed in both directions, like get_connections_for_user.
+    Returns None if the users are more than max_depth hops apart.
+    """
+    reach = _reachability_levels(user_id, [target_user_id], max_depth)
+    return await db.scalar(select(reach.c.depth).where(reach.c.user_id == target_user_id))
+
+
+async def get_degrees_of_separation(db: AsyncSession, user_id: int, target_user_ids: List[int],
+                                    max_depth: int = 3) -> Dict[int, int]:
+    """
+    Shortest hop count from one user to each of target_user_ids in a single query.
+    Targets further than max_depth hops away are left out of the result.
+    """
+    if not target_user_ids:
+        return {}
+    reach = _reachability_levels(user_id, target_user_ids, max_depth)
+    rows = (await db.execute(
+        select(reach.c.user_id, reach.c.depth).where(reach.c.user_id.in_(target_user_ids))
+    )).all()
+    return {target_user_id: depth for target_user_id, depth in rows}
+
+
+async def update_connection(db: AsyncSession, user_id: int, connected_user_id: int,
+                            connection_update: ConnectionCreate) -> Optional[Connection]:
+    db_connection = await get_connection(db, user_id, connected_user_id)
     if db_connection:
-        for key, value in connection_update.dict(exclude_unset=True).items():
+        # Moving a connection to other users would leave the mutual connection counts and the adjacency index wrong
+        for key, value in connection_update.dict(exclude_unset=True,
+                                                 exclude={"user_id", "connected_user_id"}).items():
             setattr(db_connection, key, value)
-        db.commit()
-        db.refresh(db_connection)
+        await refresh_connection_strengths(db, [db_connection.user_id])
+        await db.commit()
+        await db.refresh(db_connection)
+        strength_cache.invalidate_user(user_id)
+        strength_cache.invalidate_user(connected_user_id)
     return db_connection
 
 
-def delete_connection(db: Session, user_id: int, connected_user_id: int) -> Optional[Connection]:
-    db_connection = get_connection(db, user_id, connected_user_id)
+async def delete_connection(db: AsyncSession, user_id: int, connected_user_id: int) -> Optional[Connection]:
+    await lock_connection_writes(db)
+    db_connection = await get_connection(db, user_id, connected_user_id)
     if db_connection:
-        db.delete(db_connection)
-        db.commit()
+        if await get_connection(db, connected_user_id, user_id) is None:
+            await apply_mutual_connection_delta(db, user_id, connected_user_id, -1)
+        await db.delete(db_connection)
+        await db.commit()
+        adjacency_index.remove_edge(user_id, connected_user_id)
+        strength_cache.invalidate_user(user_id)
+        strength_cache.invalidate_user(connected_user_id)
     return db_connection
 
 
+# --- Stored Connection Strength ---
+def connection_strength_update():
+    """
+    UPDATE recomputing Connection.connection_strength from each row's endpoints: 2 per shared passion, 3 per
+    collaboration or mentorship goal of user_id naming a passion of connected_user_id and 2 per shared
+    group, capped at 5. These are the terms of calculate_connection_strength without network proximity,
+    which every direct contact passes, so introduction eligibility is judged on this column.
+    """
+    connections = Connection.__table__
+    own_passions, their_passions = user_passions.alias("own_passions"), user_passions.alias("their_passions")
+    memberships = GroupMembership.__table__
+    own_groups, their_groups = memberships.alias("own_groups"), memberships.alias("their_groups")
+
+    shared_passions = (
+        select(func.count())
+        .select_from(own_passions.join(their_passions, their_passions.c.passion_id == own_passions.c.passion_id))
+        .where(own_passions.c.user_id == connections.c.user_id,
+               their_passions.c.user_id == connections.c.connected_user_id)
+        .scalar_subquery()
+    )
+    aligned_goals = (
+        select(func.count())
+        .select_from(Goal.__table__.join(their_passions, their_passions.c.user_id == connections.c.connected_user_id)
+                     .join(Passion.__table__, Passion.id == their_passions.c.passion_id))
+        .where(Goal.user_id == connections.c.user_id,
+               Goal.goal_type.in_([GoalType.collaboration, GoalType.mentorship]),
+               func.lower(Goal.description).contains(func.lower(Passion.name)))
+        .scalar_subquery()
+    )
+    shared_groups = (
+        select(func.count())
+        .select_from(own_groups.join(their_groups, their_groups.c.group_id == own_groups.c.group_id))
+        .where(own_groups.c.user_id == connections.c.user_id,
+               their_groups.c.user_id == connections.c.connected_user_id)
+        .scalar_subquery()
+    )
+    strength = shared_passions * 2 + aligned_goals * 3 + shared_groups * 2
+    return update(connections).values(connection_strength=case((strength > 5, 5), else_=strength))
+
+
+async def refresh_connection_strengths(db: AsyncSession, user_ids) -> None:
+    """
+    Recompute the stored strength of every connection of user_ids, in either direction. Called by every
+    write that changes a strength term, before it commits. Does not commit.
+    """
+    user_ids = list(user_ids)
+    connections = Connection.__table__
+    await db.execute(connection_strength_update().where(
+        connections.c.user_id.in_(user_ids) | connections.c.connected_user_id.in_(user_ids)))
+
+
+async def rebuild_connection_strengths(db: AsyncSession) -> int:
+    """
+    Recompute the stored strength of every connection. Used for backfill and repair.
+    Returns the number of connections.
+    """
+    await db.execute(connection_strength_update())
+    await db.commit()
+    return await db.scalar(select(func.count()).select_from(Connection))
+
+
+# --- MutualConnection CRUD Operations ---
+def _ordered_pair(user_id: int, other_user_id: int) -> tuple[int, int]:
+    return (user_id, other_user_id) if user_id < other_user_id else (other_user_id, user_id)
+
+
+# Any constant works, as long as nothing else takes the same advisory lock
+CONNECTION_WRITE_LOCK_KEY = 0x57656176
+
+
+async def lock_connection_writes(db: AsyncSession) -> None:
+    """
+    Serialize connection writes until the transaction ends. The mutual connection deltas read the reverse
+    edge and both sides' contacts before writing, so concurrent writes touching the same users would
+    double count or miss each other. A transaction-level advisory lock on Postgres; SQLite already
+    allows one writer, and a transaction that read before another committed fails instead of miscounting.
+    """
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(select(func.pg_advisory_xact_lock(CONNECTION_WRITE_LOCK_KEY)))
+
+
+async def _neighbour_ids(db: AsyncSession, user_id: int) -> Set[int]:
+    rows = (await db.execute(select(Connection.user_id, Connection.connected_user_id).where(
+        (Connection.user_id == user_id) | (Connection.connected_user_id == user_id)))).all()
+    return {connected_user_id if owner_id == user_id else owner_id for owner_id, connected_user_id in rows} - {user_id}
+
+
+async def apply_mutual_connection_delta(db: AsyncSession, user_id: int, connected_user_id: int, delta: int) -> None:
+    """
+    Adjust mutual connection counts when user_id and connected_user_id become connected (delta=1)
+    or disconnected (delta=-1). Every existing contact of one side gains or loses a mutual
+    connection with the other side. Does not commit.
+    """
+    pairs = {_ordered_pair(connected_user_id, other_id)
+             for other_id in await _neighbour_ids(db, user_id) - {connected_user_id}}
+    pairs |= {_ordered_pair(user_id, other_id)
+              for other_id in await _neighbour_ids(db, connected_user_id) - {user_id}}
+    if not pairs:
+        return
+
+    if delta > 0:
+        stmt = dialect_insert(db, MutualConnection.__table__).values(
+            [{"user_a": user_a, "user_b": user_b, "count": delta} for user_a, user_b in pairs])
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=["user_a", "user_b"],
+            set_={"count": MutualConnection.count + stmt.excluded["count"]},
+        ))
+    else:
+        pair_filter = tuple_(MutualConnection.user_a, MutualConnection.user_b).in_(pairs)
+        await db.execute(update(MutualConnection).where(pair_filter).values(count=MutualConnection.count + delta))
+        await db.execute(delete(MutualConnection).where(pair_filter, MutualConnection.count <= 0))
+
+
+async def get_mutual_connection_count(db: AsyncSession, user_id: int, other_user_id: int) -> int:
+    user_a, user_b = _ordered_pair(user_id, other_user_id)
+    count = await db.scalar(select(MutualConnection.count).where(MutualConnection.user_a == user_a,
+                                                                 MutualConnection.user_b == user_b))
+    return count or 0
+
+
+async def rebuild_mutual_connections(db: AsyncSession, user_ids: Optional[List[int]] = None) -> int:
+    """
+    Recompute mutual connection counts from the connections table, either for every pair
+    or only for pairs involving user_ids. Used for backfill and repair.
+    Returns the number of pairs recomputed.
+    """
+    await lock_connection_writes(db)
+    edges = union(
+        select(Connection.user_id.label("user_id"), Connection.connected_user_id.label("neighbour_id")),
+        select(Connection.connected_user_id, Connection.user_id),
+    ).cte("edges")
+    left_edge, right_edge = edges.alias("left_edge"), edges.alias("right_edge")
+
+    counts = (
+        select(left_edge.c.neighbour_id, right_edge.c.neighbour_id, func.count())
+        .select_from(left_edge.join(right_edge, and_(left_edge.c.user_id == right_edge.c.user_id,
+                                                     left_edge.c.neighbour_id < right_edge.c.neighbour_id)))
+        .where(left_edge.c.user_id != left_edge.c.neighbour_id, right_edge.c.user_id != right_edge.c.neighbour_id)
+        .group_by(left_edge.c.neighbour_id, right_edge.c.neighbour_id)
+    )
+    delete_stmt = delete(MutualConnection)
+    recomputed = select(func.count()).select_from(MutualConnection)
+    if user_ids is not None:
+        counts = counts.where(or_(left_edge.c.neighbour_id.in_(user_ids), right_edge.c.neighbour_id.in_(user_ids)))
+        involved = or_(MutualConnection.user_a.in_(user_ids), MutualConnection.user_b.in_(user_ids))
+        delete_stmt = delete_stmt.where(involved)
+        recomputed = recomputed.where(involved)
+
+    await db.execute(delete_stmt)
+    # rowcount of an INSERT ... SELECT is -1 on SQLite, so count the rows instead
+    await db.execute(insert(MutualConnection).from_select(["user_a", "user_b", "count"], counts))
+    count = await db.scalar(recomputed)
+    await db.commit()
+    return count
+
+
 # --- Introduction CRUD operations ---
-def create_introduction(db: Session, introduction: IntroductionCreate) -> Introduction:
+async def create_introduction(db: AsyncSession, introduction: IntroductionCreate) -> Introduction:
     db_introduction = Introduction(**introduction.dict())
     db.add(db_introduction)
-    db.commit()
-    db.refresh(db_introduction)
+    await db.commit()
+    await db.refresh(db_introduction)
     return db_introduction
 
 
-def get_introduction(db: Session, introduction_id: int) -> Optional[Introduction]:
-    return db.query(Introduction).filter(Introduction.id == introduction_id).first()
+async def get_introduction(db: AsyncSession, introduction_id: int) -> Optional[Introduction]:
+    return await db.scalar(select(Introduction).where(Introduction.id == introduction_id))
 
 
-def get_introductions_by_user(db: Session, user_id: int) -> List[Introduction]:
-    return db.query(Introduction).filter(
+async def get_introductions_by_user(db: AsyncSession, user_id: int) -> List[Introduction]:
+    return (await db.scalars(select(Introduction).where(
         (Introduction.introducer_id == user_id) | (Introduction.target_user_id == user_id)
-    ).all()
+    ))).all()
 
 
-def update_introduction(db: Session, introduction_id: int, introduction_update: IntroductionCreate) -> Optional[
-    Introduction]:
-    db_introduction = get_introduction(db, introduction_id)
+async def update_introduction(db: AsyncSession, introduction_id: int,
+                              introduction_update: IntroductionCreate) -> Optional[Introduction]:
+    db_introduction = await get_introduction(db, introduction_id)
     if db_introduction:
         for key, value in introduction_update.dict(exclude_unset=True).items():
             setattr(db_introduction, key, value)
-        db.commit()
-        db.refresh(db_introduction)
+        await db.commit()
+        await db.refresh(db_introduction)
     return db_introduction
 
 
-def delete_introduction(db: Session, introduction_id: int) -> Optional[Introduction]:
-    db_introduction = get_introduction(db, introduction_id)
+async def delete_introduction(db: AsyncSession, introduction_id: int) -> Optional[Introduction]:
+    db_introduction = await get_introduction(db, introduction_id)
     if db_introduction:
-        db.delete(db_introduction)
-        db.commit()
+        await db.delete(db_introduction)
+        await db.commit()
     return db_introduction
 
 
 # --- Group CRUD operations ---
-def create_group(db: Session, group: GroupCreate) -> Group:
+async def create_group(db: AsyncSession, group: GroupCreate) -> Group:
     db_group = Group(**group.dict())
     db.add(db_group)
-    db.commit()
-    db.refresh(db_group)
+    await db.commit()
+    await db.refresh(db_group)
     return db_group
 
 
-def get_group(db: Session, group_id: int) -> Optional[Group]:
-    return db.query(Group).filter(Group.id == group_id).first()
+async def get_group(db: AsyncSession, group_id: int) -> Optional[Group]:
+    return await db.scalar(select(Group).where(Group.id == group_id))
 
 
-def get_groups(db: Session, skip: int = 0, limit: int = 100) -> list[Type[Group]]:
-    return db.query(Group).offset(skip).limit(limit).all()
+async def get_groups(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[Type[Group]]:
+    return (await db.scalars(select(Group).offset(skip).limit(limit))).all()
 
 
-def update_group(db: Session, group_id: int, group_update: GroupCreate) -> Optional[Group]:
-    db_group = get_group(db, group_id)
+async def update_group(db: AsyncSession, group_id: int, group_update: GroupCreate) -> Optional[Group]:
+    db_group = await get_group(db, group_id)
     if db_group:
         for key, value in group_update.dict(exclude_unset=True).items():
             setattr(db_group, key, value)
-        db.commit()
-        db.refresh(db_group)
+        await db.commit()
+        await db.refresh(db_group)
     return db_group
 
 
-def delete_group(db: Session, group_id: int) -> Optional[Group]:
-    db_group = get_group(db, group_id)
+async def delete_group(db: AsyncSession, group_id: int) -> Optional[Group]:
+    db_group = await get_group(db, group_id)
     if db_group:
-        db.delete(db_group)
-        db.commit()
+        await db.delete(db_group)
+        await db.commit()
     return db_group
 
 
 # --- GroupMembership CRUD operations ---
-def create_group_membership(db: Session, group_membership: GroupMembershipCreate) -> GroupMembership:
+async def create_group_membership(db: AsyncSession, group_membership: GroupMembershipCreate) -> GroupMembership:
     db_group_membership = GroupMembership(**group_membership.dict())
     db.add(db_group_membership)
-    db.commit()
-    db.refresh(db_group_membership)
+    await refresh_connection_strengths(db, [db_group_membership.user_id])
+    await db.commit()
+    await db.refresh(db_group_membership)
+    strength_cache.invalidate_user(db_group_membership.user_id)
     return db_group_membership
 
 
-def get_group_membership(db: Session, user_id: int, group_id: int) -> Optional[GroupMembership]:
-    return db.query(GroupMembership).filter(GroupMembership.user_id == user_id,
-                                            GroupMembership.group_id == group_id).first()
+async def get_group_membership(db: AsyncSession, user_id: int, group_id: int) -> Optional[GroupMembership]:
+    return await db.scalar(select(GroupMembership).where(GroupMembership.user_id == user_id,
+                                                         GroupMembership.group_id == group_id))
 
 
-def get_group_memberships_by_user(db: Session, user_id: int) -> List[GroupMembership]:
-    return db.query(GroupMembership).filter(GroupMembership.user_id == user_id).all()
+async def get_group_memberships_by_user(db: AsyncSession, user_id: int) -> List[GroupMembership]:
+    return (await db.scalars(select(GroupMembership).where(GroupMembership.user_id == user_id))).all()
 
 
-def update_group_membership(db: Session, user_id: int, group_id: int, group_membership_update: GroupMembershipCreate) -> \
-        Optional[GroupMembership]:
-    db_group_membership = get_group_membership(db, user_id, group_id)
+async def update_group_membership(db: AsyncSession, user_id: int, group_id: int,
+                                  group_membership_update: GroupMembershipCreate) -> Optional[GroupMembership]:
+    db_group_membership = await get_group_membership(db, user_id, group_id)
     if db_group_membership:
         for key, value in group_membership_update.dict(exclude_unset=True).items():
             setattr(db_group_membership, key, value)
-        db.commit()
-        db.refresh(db_group_membership)
+        await refresh_connection_strengths(db, {user_id, db_group_membership.user_id})
+        await db.commit()
+        await db.refresh(db_group_membership)
+        strength_cache.invalidate_user(user_id)
+        strength_cache.invalidate_user(db_group_membership.user_id)
     return db_group_membership
 
 
-def delete_group_membership(db: Session, user_id: int, group_id: int) -> Optional[GroupMembership]:
-    db_group_membership = get_group_membership(db, user_id, group_id)
+async def delete_group_membership(db: AsyncSession, user_id: int, group_id: int) -> Optional[GroupMembership]:
+    db_group_membership = await get_group_membership(db, user_id, group_id)
     if db_group_membership:
-        db.delete(db_group_membership)
-        db.commit()
+        await db.delete(db_group_membership)
+        await refresh_connection_strengths(db, [user_id])
+        await db.commit()
+        strength_cache.invalidate_user(user_id)
     return db_group_membership
 
 
 # --- Badge CRUD operations ---
-def create_badge(db: Session, badge: BadgeCreate) -> Badge:
+async def create_badge(db: AsyncSession, badge: BadgeCreate) -> Badge:
     db_badge = Badge(**badge.dict())
     db.add(db_badge)
-    db.commit()
-    db.refresh(db_badge)
+    await db.commit()
+    await db.refresh(db_badge)
     return db_badge
 
 
-def get_badge(db: Session, badge_id: int) -> Optional[Badge]:
-    return db.query(Badge).filter(Badge.id == badge_id).first()
+async def get_badge(db: AsyncSession, badge_id: int) -> Optional[Badge]:
+    return await db.scalar(select(Badge).where(Badge.id == badge_id))
 
 
-def get_badges(db: Session, skip: int = 0, limit: int = 100) -> list[Type[Badge]]:
-    return db.query(Badge).offset(skip).limit(limit).all()
+async def get_badges(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[Type[Badge]]:
+    return (await db.scalars(select(Badge).offset(skip).limit(limit))).all()
 
 
-def update_badge(db: Session, badge_id: int, badge_update: BadgeCreate) -> Optional[Badge]:
-    db_badge = get_badge(db, badge_id)
+async def update_badge(db: AsyncSession, badge_id: int, badge_update: BadgeCreate) -> Optional[Badge]:
+    db_badge = await get_badge(db, badge_id)
     if db_badge:
         for key, value in badge_update.dict(exclude_unset=True).items():
             setattr(db_badge, key, value)
-        db.commit()
-        db.refresh(db_badge)
+        await db.commit()
+        await db.refresh(db_badge)
     return db_badge
 
 
-def delete_badge(db: Session, badge_id: int) -> Optional[Badge]:
-    db_badge = get_badge(db, badge_id)
+async def delete_badge(db: AsyncSession, badge_id: int) -> Optional[Badge]:
+    db_badge = await get_badge(db, badge_id)
     if db_badge:
-        db.delete(db_badge)
-        db.commit()
+        await db.delete(db_badge)
+        await db.commit()
     return db_badge
 
 
 # --- Leaderboard CRUD operations ---
-def create_leaderboard(db: Session, leaderboard: LeaderboardCreate) -> Leaderboard:
+async def create_leaderboard(db: AsyncSession, leaderboard: LeaderboardCreate) -> Leaderboard:
     db_leaderboard = Leaderboard(**leaderboard.dict())
     db.add(db_leaderboard)
-    db.commit()
-    db.refresh(db_leaderboard)
+    await db.commit()
+    await db.refresh(db_leaderboard)
     return db_leaderboard
 
 
-def get_leaderboard(db: Session, leaderboard_id: int) -> Optional[Leaderboard]:
-    return db.query(Leaderboard).filter(Leaderboard.id == leaderboard_id).first()
+async def get_leaderboard(db: AsyncSession, leaderboard_id: int) -> Optional[Leaderboard]:
+    return await db.scalar(select(Leaderboard).where(Leaderboard.id == leaderboard_id))
 
 
-def get_leaderboards(db: Session, skip: int = 0, limit: int = 100) -> list[Type[Leaderboard]]:
-    return db.query(Leaderboard).offset(skip).limit(limit).all()
+async def get_leaderboards(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[Type[Leaderboard]]:
+    return (await db.scalars(select(Leaderboard).offset(skip).limit(limit))).all()
 
 
-def update_leaderboard(db: Session, leaderboard_id: int, leaderboard_update: LeaderboardCreate) -> Optional[
+async def update_leaderboard(db: AsyncSession, leaderboard_id: int, leaderboard_update: LeaderboardCreate) -> Optional[
     Leaderboard]:
-    db_leaderboard = get_leaderboard(db, leaderboard_id)
+    db_leaderboard = await get_leaderboard(db, leaderboard_id)
     if db_leaderboard:
         for key, value in leaderboard_update.dict(exclude_unset=True).items():
             setattr(db_leaderboard, key, value)
-        db.commit()
-        db.refresh(db_leaderboard)
+        await db.commit()
+        await db.refresh(db_leaderboard)
     return db_leaderboard
 
 
-def delete_leaderboard(db: Session, leaderboard_id: int) -> Optional[Leaderboard]:
-    db_leaderboard = get_leaderboard(db, leaderboard_id)
+async def delete_leaderboard(db: AsyncSession, leaderboard_id: int) -> Optional[Leaderboard]:
+    db_leaderboard = await get_leaderboard(db, leaderboard_id)
     if db_leaderboard:
-        db.delete(db_leaderboard)
-        db.commit()
+        await db.delete(db_leaderboard)
+        await db.commit()
     return db_leaderboard
 
 
 # --- LeaderboardEntry CRUD operations ---
-def create_leaderboard_entry(db: Session, leaderboard_entry: LeaderboardEntryCreate) -> LeaderboardEntry:
+async def create_leaderboard_entry(db: AsyncSession, leaderboard_entry: LeaderboardEntryCreate) -> LeaderboardEntry:
     db_leaderboard_entry = LeaderboardEntry(**leaderboard_entry.dict())
     db.add(db_leaderboard_entry)
-    db.commit()
-    db.refresh(db_leaderboard_entry)
+    await db.commit()
+    await db.refresh(db_leaderboard_entry)
     return db_leaderboard_entry
 
 
-def get_leaderboard_entry(db: Session, leaderboard_entry_id: int) -> Optional[LeaderboardEntry]:
-    return db.query(LeaderboardEntry).filter(LeaderboardEntry.id == leaderboard_entry_id).first()
+async def get_leaderboard_entry(db: AsyncSession, leaderboard_entry_id: int) -> Optional[LeaderboardEntry]:
+    return await db.scalar(select(LeaderboardEntry).where(LeaderboardEntry.id == leaderboard_entry_id))
 
 
-def get_leaderboard_entries_by_leaderboard(db: Session, leaderboard_id: int) -> List[LeaderboardEntry]:
-    return db.query(LeaderboardEntry).filter(LeaderboardEntry.leaderboard_id == leaderboard_id).all()
+async def get_leaderboard_entries_by_leaderboard(db: AsyncSession, leaderboard_id: int) -> List[LeaderboardEntry]:
+    return (await db.scalars(select(LeaderboardEntry).where(LeaderboardEntry.leaderboard_id == leaderboard_id))).all()
 
 
 # ... (Add update and delete operations for LeaderboardEntry if needed)
 
 # --- WeavrWisdom CRUD operations ---
-def create_weavr_wisdom(db: Session, weavr_wisdom: WeavrWisdomCreate) -> WeavrWisdom:
+async def create_weavr_wisdom(db: AsyncSession, weavr_wisdom: WeavrWisdomCreate) -> WeavrWisdom:
     db_weavr_wisdom = WeavrWisdom(**weavr_wisdom.dict())
     db.add(db_weavr_wisdom)
-    db.commit()
-    db.refresh(db_weavr_wisdom)
+    await db.commit()
+    await db.refresh(db_weavr_wisdom)
     return db_weavr_wisdom
 
 
-def get_weavr_wisdom(db: Session, wisdom_id: int) -> Optional[WeavrWisdom]:
-    return db.query(WeavrWisdom).filter(WeavrWisdom.id == wisdom_id).first()
+async def get_weavr_wisdom(db: AsyncSession, wisdom_id: int) -> Optional[WeavrWisdom]:
+    return await db.scalar(select(WeavrWisdom).where(WeavrWisdom.id == wisdom_id))
 
 
-def get_all_weavr_wisdom(db: Session, skip: int = 0, limit: int = 100) -> list[Type[WeavrWisdom]]:
-    return db.query(WeavrWisdom).offset(skip).limit(limit).all()
+async def get_all_weavr_wisdom(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[Type[WeavrWisdom]]:
+    return (await db.scalars(select(WeavrWisdom).offset(skip).limit(limit))).all()
 
 
 # ... (Add update and delete operations for WeavrWisdom)
 
 # --- Event CRUD Operations ---
-def create_event(db: Session, event: EventCreate) -> Event:
+async def create_event(db: AsyncSession, event: EventCreate) -> Event:
     db_event = Event(**event.dict())
     db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    await db.commit()
+    await db.refresh(db_event)
     return db_event
 
 
-def get_event(db: Session, event_id: int) -> Optional[Event]:
-    return db.query(Event).filter(Event.id == event_id).first()
+async def get_event(db: AsyncSession, event_id: int) -> Optional[Event]:
+    return await db.scalar(select(Event).where(Event.id == event_id))
 
 
-def get_all_events(db: Session, skip: int = 0, limit: int = 100) -> list[Type[Event]]:
-    return db.query(Event).offset(skip).limit(limit).all()
+async def get_all_events(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[Type[Event]]:
+    return (await db.scalars(select(Event).offset(skip).limit(limit))).all()
 
 
 # ... (Add update and delete operations for Event)
 
 # --- Notification CRUD Operations ---
-def create_notification(db: Session, notification: NotificationCreate) -> Notification:
+async def _apply_unread_delta(db: AsyncSession, user_id: int, delta: int) -> None:
+    """
+    Atomically adjust a user's unread notification counter. Does not commit.
+    """
+    stmt = dialect_insert(db, NotificationCounter.__table__).values(user_id=user_id, unread_count=max(delta, 0))
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={"unread_count": NotificationCounter.unread_count + delta},
+    ))
+
+
+async def create_notification(db: AsyncSession, notification: NotificationCreate) -> Notification:
     db_notification = Notification(**notification.dict())
     db.add(db_notification)
-    db.commit()
-    db.refresh(db_notification)
+    if not db_notification.is_read:
+        await _apply_unread_delta(db, db_notification.user_id, 1)
+    await db.commit()
+    await db.refresh(db_notification)
     return db_notification
 
 
-def get_notification(db: Session, notification_id: int) -> Optional[Notification]:
-    return db.query(Notification).filter(Notification.id == notification_id).first()
+async def fan_out_notification(db: AsyncSession, audience, message: str) -> int:
+    """
+    Insert one notification per user in the audience subquery (a single user_id column) with one
+    INSERT ... SELECT, skipping users who turned off UserSettings.notifications_enabled or
+    NotificationSettings.push_notifications, the channel in-app notifications are delivered on.
+    Users without a settings row are opted in. Returns the number delivered.
+    """
+    recipients = (
+        select(audience.c.user_id, literal(message).label("message"))
+        .outerjoin(UserSettings, UserSettings.user_id == audience.c.user_id)
+        .outerjoin(NotificationSettings, NotificationSettings.user_id == audience.c.user_id)
+        .where(func.coalesce(UserSettings.notifications_enabled, True),
+               func.coalesce(NotificationSettings.push_notifications, True))
+    )
+    result = await db.execute(insert(Notification).from_select(["user_id", "message"], recipients))
+    counters = dialect_insert(db, NotificationCounter.__table__).from_select(
+        ["user_id", "unread_count"], recipients.with_only_columns(audience.c.user_id, literal(1)))
+    await db.execute(counters.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={"unread_count": NotificationCounter.unread_count + counters.excluded.unread_count},
+    ))
+    await db.commit()
+    return result.rowcount
 
 
-def get_notifications_for_user(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Notification]:
-    return db.query(Notification).filter(Notification.user_id == user_id).offset(skip).limit(limit).all()
+async def get_unread_notification_count(db: AsyncSession, user_id: int) -> int:
+    count = await db.scalar(select(NotificationCounter.unread_count).where(NotificationCounter.user_id == user_id))
+    return count or 0
+
+
+async def mark_all_notifications_read(db: AsyncSession, user_id: int) -> int:
+    """
+    Mark every unread notification of a user as read and lower the counter by the same amount,
+    in one transaction. Returns the number of notifications marked.
+    """
+    result = await db.execute(update(Notification).where(
+        Notification.user_id == user_id, Notification.is_read == False  # noqa: E712
+    ).values(is_read=True))
+    if result.rowcount:
+        await _apply_unread_delta(db, user_id, -result.rowcount)
+    await db.commit()
+    return result.rowcount
+
+
+async def rebuild_notification_counters(db: AsyncSession) -> int:
+    """
+    Recompute every unread counter from the notifications table. Used for backfill and repair.
+    """
+    unread = select(Notification.user_id, func.count()).where(
+        Notification.is_read == False  # noqa: E712
+    ).group_by(Notification.user_id)
+    await db.execute(delete(NotificationCounter))
+    result = await db.execute(insert(NotificationCounter).from_select(["user_id", "unread_count"], unread))
+    await db.commit()
+    return result.rowcount
+
+
+async def get_notification(db: AsyncSession, notification_id: int) -> Optional[Notification]:
+    return await db.scalar(select(Notification).where(Notification.id == notification_id))
+
+
+async def get_notifications_for_user(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100,
+                                     cursor: Optional[str] = None, columns: Optional[Sequence] = None) -> Page:
+    return await fetch_page(db, select(Notification).where(Notification.user_id == user_id),
+                            Notification.created_at, Notification.id, cursor, skip, limit, columns)
 
 
 # ... (Add update and delete operations for Notification)
 
 # --- Message CRUD Operations ---
-def create_message(db: Session, message: MessageCreate) -> Message:
+async def create_message(db: AsyncSession, message: MessageCreate) -> Message:
     db_message = Message(**message.dict())
     db.add(db_message)
-    db.commit()
-    db.refresh(db_message)
+    await db.commit()
+    await db.refresh(db_message)
     return db_message
 
 
-def get_conversation(db: Session, user1_id: int, user2_id: int, skip: int = 0, limit: int = 100) -> List[Message]:
-    return db.query(Message).filter(
+async def get_conversation(db: AsyncSession, user1_id: int, user2_id: int, skip: int = 0, limit: int = 100,
+                           cursor: Optional[str] = None, columns: Optional[Sequence] = None) -> Page:
+    # Chronological, as conversations were listed before keyset pagination
+    return await fetch_page(db, select(Message).where(
         ((Message.sender_id == user1_id) & (Message.receiver_id == user2_id)) |
         ((Message.sender_id == user2_id) & (Message.receiver_id == user1_id))
-    ).offset(skip).limit(limit).all()
+    ), Message.sent_at, Message.id, cursor, skip, limit, columns, oldest_first=True)
 
 
-def get_messages_for_user(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Message]:
-    return db.query(Message).filter(Message.sender_id == user_id).offset(skip).limit(limit).all()
+async def get_messages_for_user(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[Message]:
+    return (await db.scalars(select(Message).where(Message.sender_id == user_id).offset(skip).limit(limit))).all()
 
 
-def update_message(db: Session, message_id: int, message_update: MessageCreate) -> list[Message]:
-    db_message = get_messages_for_user(db, message_id)
+async def update_message(db: AsyncSession, message_id: int, message_update: MessageCreate) -> list[Message]:
+    db_message = await get_messages_for_user(db, message_id)
     if db_message:
         for key, value in message_update.dict(exclude_unset=True).items():
             setattr(db_message, key, value)
-        db.commit()
-        db.refresh(db_message)
+        await db.commit()
+        await db.refresh(db_message)
     return db_message
 
 
-def delete_message(db: Session, message_id: int) -> list[Message]:
-    db_message = get_messages_for_user(db, message_id)
+async def delete_message(db: AsyncSession, message_id: int) -> list[Message]:
+    db_message = await get_messages_for_user(db, message_id)
     if db_message:
-        db.delete(db_message)
-        db.commit()
+        await db.delete(db_message)
+        await db.commit()
     return db_message
 
 
+def _counter_values(model, values: dict) -> dict:
+    # A counter change is not an edit, so updated_at (and the Last-Modified built from it) keeps its value
+    if hasattr(model, "updated_at"):
+        values["updated_at"] = model.updated_at
+    return values
+
+
+def _adjust_count(model, column, row_id: int, delta: int):
+    """
+    UPDATE ... SET column = column + delta for one row, so concurrent writers never lose an increment.
+    """
+    values = _counter_values(model, {column.key: column + delta})
+    return update(model).where(model.id == row_id).values(values).execution_options(synchronize_session=False)
+
+
 # --- Post CRUD Operations ---
-def create_post(db: Session, post: PostCreate, author_id: int) -> Post:
-    db_post = Post(**post.dict(), author_id=author_id)  # Pass author_id here
+async def create_post(db: AsyncSession, post: PostCreate, author_id: int) -> Post:
+    # Visibility is accepted by the schema but has no column; every post goes to its author's whole audience
+    db_post = Post(**post.dict(exclude={"author_id", "visibility"}), author_id=author_id)
     db.add(db_post)
-    db.commit()
-    db.refresh(db_post)
+    await db.flush()
+    await fan_out_post(db, db_post)
+    await db.commit()
+    await db.refresh(db_post)
     return db_post
 
 
-def get_post(db: Session, post_id: int) -> Optional[Post]:
-    return db.query(Post).filter(Post.id == post_id).first()
+async def get_post(db: AsyncSession, post_id: int) -> Optional[Post]:
+    return await db.scalar(select(Post).where(Post.id == post_id))
 
 
-def get_all_posts(db: Session, skip: int = 0, limit: int = 100) -> list[Type[Post]]:
-    return db.query(Post).order_by(Post.created_at.desc()).offset(skip).limit(limit).all()
+async def get_all_posts(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                        columns: Optional[Sequence] = None) -> Page:
+    return await fetch_page(db, select(Post), Post.created_at, Post.id, cursor, skip, limit, columns)
 
 
-def update_post(db: Session, post_id: int, post_update: PostCreate) -> Optional[Post]:
-    db_post = get_post(db, post_id)
+async def update_post(db: AsyncSession, post_id: int, post_update: PostCreate) -> Optional[Post]:
+    db_post = await get_post(db, post_id)
     if db_post:
         for key, value in post_update.dict(exclude_unset=True).items():
             setattr(db_post, key, value)
-        db.commit()
-        db.refresh(db_post)
+        await db.commit()
+        await db.refresh(db_post)
     return db_post
 
 
-def delete_post(db: Session, post_id: int) -> Optional[Post]:
-    db_post = get_post(db, post_id)
+async def delete_post(db: AsyncSession, post_id: int) -> Optional[Post]:
+    db_post = await get_post(db, post_id)
     if db_post:
-        db.delete(db_post)
-        db.commit()
+        await db.execute(delete(TimelineEntry).where(TimelineEntry.post_id == post_id))
+        await db.delete(db_post)
+        await db.commit()
     return db_post
 
 
+# --- Timeline operations ---
+def _timeline_audience(user_id: int):
+    """
+    Users related to user_id: the user, their connections in either direction and members of their groups.
+    The relation is symmetric, so this is both the audience of user_id's posts and the authors of their feed.
+    """
+    own_groups = select(GroupMembership.group_id).where(GroupMembership.user_id == user_id)
+    return union(
+        select(literal(user_id, Integer).label("user_id")),
+        select(Connection.connected_user_id).where(Connection.user_id == user_id),
+        select(Connection.user_id).where(Connection.connected_user_id == user_id),
+        select(GroupMembership.user_id).where(GroupMembership.group_id.in_(own_groups)),
+    )
+
+
+def _timeline_overflow(user_ids):
+    """
+    (user_id, post_id) of the entries past the newest TIMELINE_MAX_ENTRIES of each timeline in user_ids. One
+    row_number() pass over those timelines, ordered like the feed, so entries with equal created_at are cut
+    by post_id rather than all kept or all dropped.
+    """
+    ranked = (
+        select(TimelineEntry.user_id, TimelineEntry.post_id,
+               func.row_number().over(partition_by=TimelineEntry.user_id,
+                                      order_by=(TimelineEntry.created_at.desc(), TimelineEntry.post_id.desc()))
+               .label("position"))
+        .where(TimelineEntry.user_id.in_(user_ids))
+        .subquery()
+    )
+    return select(ranked.c.user_id, ranked.c.post_id).where(ranked.c.position > settings.TIMELINE_MAX_ENTRIES)
+
+
+async def fan_out_post(db: AsyncSession, post: Post) -> int:
+    """
+    Write post into the timeline of everyone in its author's audience with one INSERT ... SELECT and trim
+    those timelines to TIMELINE_MAX_ENTRIES. Authors whose audience exceeds TIMELINE_FANOUT_MAX_AUDIENCE
+    are recorded as fan-out-on-read instead, and feeds pull their posts at read time.
+    Does not commit. Returns the number of timelines written.
+    """
+    if await db.get(FanoutOnReadAuthor, post.author_id) is not None:
+        return 0
+
+    audience = _timeline_audience(post.author_id).subquery()
+    audience_size = await db.scalar(select(func.count()).select_from(audience))
+    if audience_size > settings.TIMELINE_FANOUT_MAX_AUDIENCE:
+        await db.execute(dialect_insert(db, FanoutOnReadAuthor.__table__).values(
+            user_id=post.author_id, audience_size=audience_size
+        ).on_conflict_do_nothing())
+        return 0
+
+    await db.execute(insert(TimelineEntry).from_select(
+        ["user_id", "post_id", "created_at"],
+        select(audience.c.user_id, literal(post.id, Integer), literal(post.created_at, DateTime)),
+    ))
+    await db.execute(delete(TimelineEntry).where(
+        tuple_(TimelineEntry.user_id, TimelineEntry.post_id).in_(_timeline_overflow(select(audience.c.user_id)))
+    ))
+    return audience_size
+
+
+async def get_home_timeline(db: AsyncSession, user_id: int, limit: int = 100, cursor: Optional[str] = None,
+                            columns: Optional[Sequence] = None) -> Page:
+    """
+    Home feed page for user_id, newest first, in one statement: a range of the user's timeline entries
+    merged with the posts of related fan-out-on-read authors.
+    """
+    entries = select(TimelineEntry.post_id, TimelineEntry.created_at).where(TimelineEntry.user_id == user_id)
+    pulled = select(Post.id.label("post_id"), Post.created_at).where(Post.author_id.in_(
+        select(FanoutOnReadAuthor.user_id).where(FanoutOnReadAuthor.user_id.in_(_timeline_audience(user_id)))
+    ))
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        entries = entries.where(tuple_(TimelineEntry.created_at, TimelineEntry.post_id) < tuple_(sort_value, row_id))
+        pulled = pulled.where(tuple_(Post.created_at, Post.id) < tuple_(sort_value, row_id))
+
+    # Each branch is cut to one page before merging; wrapping them as subqueries keeps SQLite happy
+    branches = [
+        branch.order_by(branch.selected_columns.created_at.desc(), branch.selected_columns.post_id.desc())
+        .limit(limit + 1).subquery()
+        for branch in (entries, pulled)
+    ]
+    feed = union(*(select(branch.c.post_id) for branch in branches)).subquery()
+    return await fetch_page(db, select(Post).join(feed, feed.c.post_id == Post.id),
+                            Post.created_at, Post.id, cursor, 0, limit, columns)
+
+
+async def rebuild_timelines(db: AsyncSession) -> int:
+    """
+    Rebuild every home timeline from the posts table and re-pick the fan-out-on-read authors.
+    Used for backfill and repair. Returns the number of timeline entries written.
+    """
+    author_groups, reader_groups = aliased(GroupMembership), aliased(GroupMembership)
+    pairs = union(
+        select(User.id.label("author_id"), User.id.label("user_id")),
+        select(Connection.user_id, Connection.connected_user_id),
+        select(Connection.connected_user_id, Connection.user_id),
+        select(author_groups.user_id, reader_groups.user_id)
+        .join(reader_groups, reader_groups.group_id == author_groups.group_id),
+    ).subquery()
+
+    await db.execute(delete(TimelineEntry))
+    await db.execute(delete(FanoutOnReadAuthor))
+    await db.execute(insert(FanoutOnReadAuthor).from_select(
+        ["user_id", "audience_size"],
+        select(pairs.c.author_id, func.count()).group_by(pairs.c.author_id)
+        .having(func.count() > settings.TIMELINE_FANOUT_MAX_AUDIENCE),
+    ))
+
+    ranked = (
+        select(pairs.c.user_id, Post.id.label("post_id"), Post.created_at,
+               func.row_number().over(partition_by=pairs.c.user_id,
+                                      order_by=(Post.created_at.desc(), Post.id.desc())).label("position"))
+        .join(Post, Post.author_id == pairs.c.author_id)
+        .where(pairs.c.author_id.not_in(select(FanoutOnReadAuthor.user_id)))
+        .subquery()
+    )
+    result = await db.execute(insert(TimelineEntry).from_select(
+        ["user_id", "post_id", "created_at"],
+        select(ranked.c.user_id, ranked.c.post_id, ranked.c.created_at)
+        .where(ranked.c.position <= settings.TIMELINE_MAX_ENTRIES),
+    ))
+    await db.commit()
+    return result.rowcount
+
+
 # --- Comment CRUD Operations ---
-def create_comment(db: Session, comment: CommentCreate, author_id: int, post_id: int) -> Comment:
-    db_comment = Comment(**comment.dict(), author_id=author_id, post_id=post_id)
+async def create_comment(db: AsyncSession, comment: CommentCreate, author_id: int, post_id: int) -> Comment:
+    if comment.parent_id is not None:
+        # Threads are one level deep: the reply counter update doubles as the check that the parent qualifies
+        result = await db.execute(_adjust_count(Comment, Comment.reply_count, comment.parent_id, 1).where(
+            Comment.post_id == post_id, Comment.parent_id.is_(None)))
+        if not result.rowcount:
+            await db.rollback()
+            raise ValueError("Replies must target a top-level comment on the same post.")
+    db_comment = Comment(**comment.dict(exclude={"author_id", "post_id"}), author_id=author_id, post_id=post_id)
     db.add(db_comment)
-    db.commit()
-    db.refresh(db_comment)
+    await db.execute(_adjust_count(Post, Post.comment_count, post_id, 1))
+    await db.commit()
+    await db.refresh(db_comment)
     return db_comment
 
 
-def get_comment(db: Session, comment_id: int) -> Optional[Comment]:
-    return db.query(Comment).filter(Comment.id == comment_id).first()
+async def get_comment(db: AsyncSession, comment_id: int) -> Optional[Comment]:
+    return await db.scalar(select(Comment).where(Comment.id == comment_id))
 
 
-def get_comments_for_post(db: Session, post_id: int, skip: int = 0, limit: int = 100) -> List[Comment]:
-    return db.query(Comment).filter(Comment.post_id == post_id).order_by(Comment.created_at.desc()).offset(skip).limit(
-        limit).all()
+async def get_comments_for_post(db: AsyncSession, post_id: int, skip: int = 0, limit: int = 100,
+                                cursor: Optional[str] = None) -> Page:
+    return await fetch_page(db, select(Comment).where(Comment.post_id == post_id),
+                            Comment.created_at, Comment.id, cursor, skip, limit)
 
 
-def update_comment(db: Session, comment_id: int, comment_update: CommentCreate) -> Optional[Comment]:
-    db_comment = get_comment(db, comment_id)
+async def update_comment(db: AsyncSession, comment_id: int, comment_update: CommentCreate) -> Optional[Comment]:
+    db_comment = await get_comment(db, comment_id)
     if db_comment:
-        for key, value in comment_update.dict(exclude_unset=True).items():
+        # Moving a comment between threads would leave the reply counters wrong
+        for key, value in comment_update.dict(exclude_unset=True, exclude={"parent_id"}).items():
             setattr(db_comment, key, value)
-        db.commit()
-        db.refresh(db_comment)
+        await db.commit()
+        await db.refresh(db_comment)
     return db_comment
 
 
-def delete_comment(db: Session, comment_id: int) -> Optional[Comment]:
-    db_comment = get_comment(db, comment_id)
+async def delete_comment(db: AsyncSession, comment_id: int) -> Optional[Comment]:
+    db_comment = await get_comment(db, comment_id)
     if db_comment:
-        db.delete(db_comment)
-        db.commit()
+        removed = 1
+        if db_comment.parent_id is not None:
+            await db.execute(_adjust_count(Comment, Comment.reply_count, db_comment.parent_id, -1))
+        else:
+            replies = select(Comment.id).where(Comment.parent_id == comment_id)
+            await db.execute(delete(Like).where(Like.comment_id.in_(replies)))
+            result = await db.execute(delete(Comment).where(Comment.parent_id == comment_id).execution_options(
+                synchronize_session=False))
+            removed += result.rowcount
+        await db.execute(_adjust_count(Post, Post.comment_count, db_comment.post_id, -removed))
+        await db.delete(db_comment)
+        await db.commit()
     return db_comment
 
 
+async def get_replies(db: AsyncSession, comment_id: int, skip: int = 0, limit: int = 100,
+                      cursor: Optional[str] = None) -> Page:
+    return await fetch_page(db, select(Comment).where(Comment.parent_id == comment_id),
+                            Comment.created_at, Comment.id, cursor, skip, limit)
+
+
+async def get_reply_previews(db: AsyncSession, parent_ids: List[int], per_thread: int) -> Dict[int, Page]:
+    """
+    The newest per_thread replies of every parent comment in one windowed query, each as a Page whose
+    next_cursor continues that thread through get_replies.
+    """
+    previews = {parent_id: [] for parent_id in parent_ids}
+    if parent_ids and per_thread > 0:
+        position = func.row_number().over(partition_by=Comment.parent_id,
+                                          order_by=(Comment.created_at.desc(), Comment.id.desc()))
+        ranked = select(Comment, position.label("position")).where(Comment.parent_id.in_(parent_ids)).subquery()
+        reply = aliased(Comment, ranked)
+        # One extra reply per thread tells whether the thread continues past the preview
+        replies = await db.scalars(select(reply).where(ranked.c.position <= per_thread + 1)
+                                   .order_by(ranked.c.parent_id, ranked.c.position))
+        for comment in replies:
+            previews[comment.parent_id].append(comment)
+
+    pages = {}
+    for parent_id, replies in previews.items():
+        items = replies[:per_thread]
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id) if len(replies) > per_thread else None
+        pages[parent_id] = Page(items, next_cursor)
+    return pages
+
+
+async def get_comment_threads(db: AsyncSession, post_id: int, skip: int = 0, limit: int = 100,
+                              cursor: Optional[str] = None, replies: int = 3) -> Page:
+    """
+    A page of a post's top-level comments, each paired with a Page of its newest replies. Two queries
+    however many threads the page holds; like and reply counts come from the comment rows.
+    """
+    if replies < 0:
+        raise ValueError("replies must not be negative.")
+    page = await fetch_page(db, select(Comment).where(Comment.post_id == post_id, Comment.parent_id.is_(None)),
+                            Comment.created_at, Comment.id, cursor, skip, limit)
+    previews = await get_reply_previews(db, [comment.id for comment in page.items], replies)
+    return Page([(comment, previews[comment.id]) for comment in page.items], page.next_cursor)
+
+
 # --- Like CRUD Operations ---
-def create_like(db: Session, like: LikeCreate) -> Like:
-    db_like = Like(**like.dict())
-    db.add(db_like)
-    db.commit()
-    db.refresh(db_like)
-    return db_like
+async def _adjust_like_counts(db: AsyncSession, like: Like, delta: int) -> None:
+    if like.post_id is not None:
+        await db.execute(_adjust_count(Post, Post.like_count, like.post_id, delta))
+    if like.comment_id is not None:
+        await db.execute(_adjust_count(Comment, Comment.like_count, like.comment_id, delta))
+
+
+def _like_target(post_id: Optional[int], comment_id: Optional[int]):
+    if (post_id is None) == (comment_id is None):
+        raise ValueError("A like targets exactly one of post_id and comment_id.")
+    if post_id is not None:
+        return Like.post_id, post_id, Post
+    return Like.comment_id, comment_id, Comment
+
+
+def _ignoring_duplicate_likes(stmt, target_column):
+    return stmt.on_conflict_do_nothing(index_elements=["user_id", target_column.key],
+                                       index_where=target_column.isnot(None))
+
+
+async def create_like(db: AsyncSession, like: LikeCreate) -> Like:
+    """
+    Like a post, or return the existing like if the user already liked it. The counter only moves for a new row.
+    """
+    stmt = dialect_insert(db, Like.__table__).values(**like.dict())
+    like_id = await db.scalar(_ignoring_duplicate_likes(stmt, Like.post_id).returning(Like.id))
+    if like_id is not None:
+        await db.execute(_adjust_count(Post, Post.like_count, like.post_id, 1))
+    await db.commit()
+    return await get_like(db, like.user_id, post_id=like.post_id)
+
+
+async def toggle_like(db: AsyncSession, user_id: int, post_id: Optional[int] = None,
+                      comment_id: Optional[int] = None) -> Optional[Tuple[bool, int]]:
+    """
+    Unlike the target if the user liked it, otherwise like it, and return (liked, like_count), or None if the
+    target does not exist. With the unique like indexes a concurrent duplicate insert does nothing, so a
+    double tap never creates two likes. One statement on Postgres, through data-modifying CTEs; SQLite
+    has none, so it runs up to three in the same transaction.
+    """
+    target_column, target_id, model = _like_target(post_id, comment_id)
+    likes = Like.__table__
+    mine = and_(likes.c.user_id == user_id, target_column == target_id)
+    counter = update(model.__table__).where(model.id == target_id)
+    try:
+        if db.bind.dialect.name == "postgresql":
+            removed = delete(likes).where(mine).returning(likes.c.id).cte("removed")
+            removed_count = select(func.count()).select_from(removed).scalar_subquery()
+            added = _ignoring_duplicate_likes(dialect_insert(db, likes).from_select(
+                ["user_id", target_column.key, "created_at"],
+                select(literal(user_id, Integer), literal(target_id, Integer), literal(datetime.utcnow(), DateTime))
+                .where(~exists(select(removed.c.id))),
+            ), target_column).returning(likes.c.id).cte("added")
+            added_count = select(func.count()).select_from(added).scalar_subquery()
+            counted = counter.values(_counter_values(
+                model, {"like_count": model.like_count + added_count - removed_count}
+            )).returning(model.like_count).cte("counted")
+            # Nothing removed means the user likes the target now, whether this insert or a concurrent one won
+            liked, like_count = (await db.execute(select(
+                (removed_count == 0).label("liked"), select(counted.c.like_count).scalar_subquery()
+            ))).one()
+        else:
+            removed = (await db.execute(delete(likes).where(mine).returning(likes.c.id))).all()
+            liked, delta = not removed, -len(removed)
+            if liked:
+                added = await db.execute(_ignoring_duplicate_likes(dialect_insert(db, likes).values(
+                    {"user_id": user_id, target_column.key: target_id}
+                ), target_column).returning(likes.c.id))
+                delta = len(added.all())
+            like_count = await db.scalar(counter.values(_counter_values(
+                model, {"like_count": model.like_count + delta})).returning(model.like_count))
+    except IntegrityError:
+        like_count = None  # The like's foreign key points at a missing target
+    if like_count is None:
+        await db.rollback()
+        return None
+    await db.commit()
+    return liked, like_count
 
 
-def get_like(db: Session, user_id: int, post_id: int = None, comment_id: int = None) -> Optional[Like]:
-    query = db.query(Like).filter(Like.user_id == user_id)
+async def get_like(db: AsyncSession, user_id: int, post_id: int = None, comment_id: int = None) -> Optional[Like]:
+    stmt = select(Like).where(Like.user_id == user_id)
     if post_id:
-        query = query.filter(Like.post_id == post_id)
+        stmt = stmt.where(Like.post_id == post_id)
     if comment_id:
-        query = query.filter(Like.comment_id == comment_id)
-    return query.first()
+        stmt = stmt.where(Like.comment_id == comment_id)
+    return await db.scalar(stmt)
 
 
-def delete_like(db: Session, like_id: int) -> Optional[Like]:
-    db_like = db.query(Like).filter(Like.id == like_id).first()
+async def delete_like(db: AsyncSession, like_id: int) -> Optional[Like]:
+    db_like = await db.scalar(select(Like).where(Like.id == like_id))
     if db_like:
-        db.delete(db_like)
-        db.commit()
+        await _adjust_like_counts(db, db_like, -1)
+        await db.delete(db_like)
+        await db.commit()
     return db_like
 
 
+async def reconcile_engagement_counters(db: AsyncSession) -> int:
+    """
+    Delete duplicate likes left from before the unique like indexes, keeping the oldest, then reset every
+    like and comment counter that drifted from the rows it counts. Returns the number of rows repaired.
+    """
+    repaired = 0
+    older, reply = aliased(Like), aliased(Comment)
+    for column, older_column in ((Like.post_id, older.post_id), (Like.comment_id, older.comment_id)):
+        result = await db.execute(delete(Like).where(column.isnot(None), exists().where(
+            older.user_id == Like.user_id, older_column == column, older.id < Like.id
+        )).execution_options(synchronize_session=False))
+        repaired += result.rowcount
+    for model, column, counted in (
+        (Post, Post.like_count, select(func.count()).where(Like.post_id == Post.id)),
+        (Post, Post.comment_count, select(func.count()).where(Comment.post_id == Post.id)),
+        (Comment, Comment.like_count, select(func.count()).where(Like.comment_id == Comment.id)),
+        (Comment, Comment.reply_count, select(func.count()).select_from(reply).where(reply.parent_id == Comment.id)),
+    ):
+        actual = counted.scalar_subquery()
+        result = await db.execute(update(model).where(column != actual).values({column: actual}).execution_options(
+            synchronize_session=False))
+        repaired += result.rowcount
+    await db.commit()
+    return repaired
+
+
 # --- UserSettings CRUD operations ---
-def create_user_settings(db: Session, user_settings: UserSettingsCreate, user_id: int) -> UserSettings:
+async def create_user_settings(db: AsyncSession, user_settings: UserSettingsCreate, user_id: int) -> UserSettings:
     db_settings = UserSettings(**user_settings.dict(), user_id=user_id)
     db.add(db_settings)
-    db.commit()
-    db.refresh(db_settings)
+    await db.commit()
+    await db.refresh(db_settings)
     return db_settings
 
 
-def get_user_settings(db: Session, user_id: int) -> Optional[UserSettings]:
-    return db.query(UserSettings).filter(UserSettings.user_id == user_id).first()
+async def get_user_settings(db: AsyncSession, user_id: int) -> Optional[UserSettings]:
+    return await db.scalar(select(UserSettings).where(UserSettings.user_id == user_id))
 
 
-def update_user_settings(db: Session, user_id: int, user_settings_update: UserSettingsCreate) -> Optional[UserSettings]:
-    db_settings = get_user_settings(db, user_id)
+async def update_user_settings(db: AsyncSession, user_id: int,
+                               user_settings_update: UserSettingsCreate) -> Optional[UserSettings]:
+    db_settings = await get_user_settings(db, user_id)
     if db_settings:
         for key, value in user_settings_update.dict(exclude_unset=True).items():
             setattr(db_settings, key, value)
-        db.commit()
-        db.refresh(db_settings)
+        await db.commit()
+        await db.refresh(db_settings)
     return db_settings
 
 
 # --- Feedback CRUD operations ---
-def create_feedback(db: Session, feedback: FeedbackCreate, user_id: int) -> Feedback:
+async def create_feedback(db: AsyncSession, feedback: FeedbackCreate, user_id: int) -> Feedback:
     db_feedback = Feedback(**feedback.dict(), user_id=user_id)
     db.add(db_feedback)
-    db.commit()
-    db.refresh(db_feedback)
+    await db.commit()
+    await db.refresh(db_feedback)
     return db_feedback
 
 
-def get_feedback(db: Session, feedback_id: int) -> Optional[Feedback]:
-    return db.query(Feedback).filter(Feedback.id == feedback_id).first()
+async def get_feedback(db: AsyncSession, feedback_id: int) -> Optional[Feedback]:
+    return await db.scalar(select(Feedback).where(Feedback.id == feedback_id))
 
 
-def get_all_feedback(db: Session, skip: int = 0, limit: int = 100) -> list[Type[Feedback]]:
-    return db.query(Feedback).offset(skip).limit(limit).all()
+async def get_all_feedback(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page:
+    return await fetch_page(db, select(Feedback), Feedback.created_at, Feedback.id, cursor, skip, limit)
 
 
 # --- Report CRUD operations ---
-def create_report(db: Session, report: ReportCreate, user_id: int) -> Report:
+async def create_report(db: AsyncSession, report: ReportCreate, user_id: int) -> Report:
     db_report = Report(**report.dict(), user_id=user_id)
     db.add(db_report)
-    db.commit()
-    db.refresh(db_report)
+    await db.commit()
+    await db.refresh(db_report)
     return db_report
 
 
-def get_report(db: Session, report_id: int) -> Optional[Report]:
-    return db.query(Report).filter(Report.id == report_id).first()
+async def get_report(db: AsyncSession, report_id: int) -> Optional[Report]:
+    return await db.scalar(select(Report).where(Report.id == report_id))
 
 
-def get_all_reports(db: Session, skip: int = 0, limit: int = 100) -> list[Type[Report]]:
-    return db.query(Report).offset(skip).limit(limit).all()
+async def get_all_reports(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page:
+    return await fetch_page(db, select(Report), Report.created_at, Report.id, cursor, skip, limit)
 
 
 # --- NotificationSettings CRUD operations ---
-def create_notification_settings(db: Session, notification_settings: NotificationSettingsCreate,
-                                 user_id: int) -> NotificationSettings:
+async def create_notification_settings(db: AsyncSession, notification_settings: NotificationSettingsCreate,
+                                       user_id: int) -> NotificationSettings:
     db_notification_settings = NotificationSettings(**notification_settings.dict(), user_id=user_id)
     db.add(db_notification_settings)
-    db.commit()
-    db.refresh(db_notification_settings)
+    await db.commit()
+    await db.refresh(db_notification_settings)
     return db_notification_settings
 
 
-def get_notification_settings(db: Session, user_id: int) -> Optional[NotificationSettings]:
-    return db.query(NotificationSettings).filter(NotificationSettings.user_id == user_id).first()
+async def get_notification_settings(db: AsyncSession, user_id: int) -> Optional[NotificationSettings]:
+    return await db.scalar(select(NotificationSettings).where(NotificationSettings.user_id == user_id))
 
 
-def update_notification_settings(db: Session, user_id: int, notification_settings_update: NotificationSettingsCreate) -> \
+async def update_notification_settings(db: AsyncSession, user_id: int,
+                                       notification_settings_update: NotificationSettingsCreate) -> \
         Optional[NotificationSettings]:
-    db_notification_settings = get_notification_settings(db, user_id)
+    db_notification_settings = await get_notification_settings(db, user_id)
     if db_notification_settings:
         for key, value in notification_settings_update.dict(exclude_unset=True).items():
             setattr(db_notification_settings, key, value)
-        db.commit()
-        db.refresh(db_notification_settings)
+        await db.commit()
+        await db.refresh(db_notification_settings)
     return db_notification_settings
 
 
-def update_weavr_wisdom(db: Session, wisdom_id: int, weavr_wisdom_update: WeavrWisdomCreate) -> Optional[WeavrWisdom]:
-    db_weavr_wisdom = get_weavr_wisdom(db, wisdom_id)
+async def update_weavr_wisdom(db: AsyncSession, wisdom_id: int,
+                              weavr_wisdom_update: WeavrWisdomCreate) -> Optional[WeavrWisdom]:
+    db_weavr_wisdom = await get_weavr_wisdom(db, wisdom_id)
     if db_weavr_wisdom:
         for key, value in weavr_wisdom_update.dict(exclude_unset=True).items():
             setattr(db_weavr_wisdom, key, value)
-        db.commit()
-        db.refresh(db_weavr_wisdom)
+        await db.commit()
+        await db.refresh(db_weavr_wisdom)
     return db_weavr_wisdom
 
 
-def delete_weavr_wisdom(db: Session, wisdom_id: int) -> Optional[WeavrWisdom]:
-    db_weavr_wisdom = get_weavr_wisdom(db, wisdom_id)
+async def delete_weavr_wisdom(db: AsyncSession, wisdom_id: int) -> Optional[WeavrWisdom]:
+    db_weavr_wisdom = await get_weavr_wisdom(db, wisdom_id)
     if db_weavr_wisdom:
-        db.delete(db_weavr_wisdom)
-        db.commit()
+        await db.delete(db_weavr_wisdom)
+        await db.commit()
     return db_weavr_wisdom
 
 
-def update_event(db: Session, event_id: int, event_update: EventCreate) -> Optional[Event]:
-    db_event = get_event(db, event_id)
+async def update_event(db: AsyncSession, event_id: int, event_update: EventCreate) -> Optional[Event]:
+    db_event = await get_event(db, event_id)
     if db_event:
         for key, value in event_update.dict(exclude_unset=True).items():
             setattr(db_event, key, value)
-        db.commit()
-        db.refresh(db_event)
+        await db.commit()
+        await db.refresh(db_event)
     return db_event
 
 
-def delete_event(db: Session, event_id: int) -> Optional[Event]:
-    db_event = get_event(db, event_id)
+async def delete_event(db: AsyncSession, event_id: int) -> Optional[Event]:
+    db_event = await get_event(db, event_id)
     if db_event:
-        db.delete(db_event)
-        db.commit()
+        await db.delete(db_event)
+        await db.commit()
     return db_event
 
 
-def update_notification(db: Session, notification_id: int, notification_update: NotificationCreate) -> Optional[
-    Notification]:
-    db_notification = get_notification(db, notification_id)
+async def update_notification(db: AsyncSession, notification_id: int,
+                              notification_update: NotificationCreate) -> Optional[Notification]:
+    # Lock the row so concurrent read/unread flips cannot both adjust the counter
+    db_notification = await db.scalar(select(Notification).where(Notification.id == notification_id).with_for_update())
     if db_notification:
+        old_user_id, was_unread = db_notification.user_id, not db_notification.is_read
         for key, value in notification_update.dict(exclude_unset=True).items():
             setattr(db_notification, key, value)
-        db.commit()
-        db.refresh(db_notification)
+        if (old_user_id, was_unread) != (db_notification.user_id, not db_notification.is_read):
+            if was_unread:
+                await _apply_unread_delta(db, old_user_id, -1)
+            if not db_notification.is_read:
+                await _apply_unread_delta(db, db_notification.user_id, 1)
+        await db.commit()
+        await db.refresh(db_notification)
     return db_notification
 
 
-def delete_notification(db: Session, notification_id: int) -> Optional[Notification]:
-    db_notification = get_notification(db, notification_id)
+async def delete_notification(db: AsyncSession, notification_id: int) -> Optional[Notification]:
+    db_notification = await db.scalar(select(Notification).where(Notification.id == notification_id).with_for_update())
     if db_notification:
-        db.delete(db_notification)
-        db.commit()
+        if not db_notification.is_read:
+            await _apply_unread_delta(db, db_notification.user_id, -1)
+        await db.delete(db_notification)
+        await db.commit()
     return db_notification
+
+
+# --- Bulk Write operations ---
+async def _insert_ignoring_conflicts(db: AsyncSession, table, rows: List[dict], conflict_columns: List[str]) -> int:
+    """
+    Insert rows with multi-row INSERT ... ON CONFLICT DO NOTHING, BULK_INSERT_BATCH_SIZE rows per statement.
+    Does not commit. Returns the number of rows actually inserted.
+    """
+    inserted = 0
+    for start in range(0, len(rows), settings.BULK_INSERT_BATCH_SIZE):
+        batch = rows[start:start + settings.BULK_INSERT_BATCH_SIZE]
+        stmt = dialect_insert(db, table).values(batch).on_conflict_do_nothing(index_elements=conflict_columns)
+        inserted += (await db.execute(stmt)).rowcount
+    return inserted
+
+
+def _unique_rows(rows: List[dict], key_columns: List[str]) -> List[dict]:
+    unique = {}
+    for row in rows:
+        unique.setdefault(tuple(row[column] for column in key_columns), row)
+    return list(unique.values())
+
+
+async def bulk_create_connections(db: AsyncSession, connections: List[ConnectionCreate]) -> int:
+    rows = _unique_rows([connection.dict() for connection in connections], ["user_id", "connected_user_id"])
+    await lock_connection_writes(db)
+    inserted = await _insert_ignoring_conflicts(db, Connection.__table__, rows, ["user_id", "connected_user_id"])
+    touched_user_ids = sorted({user_id for row in rows for user_id in (row["user_id"], row["connected_user_id"])})
+    await refresh_connection_strengths(db, touched_user_ids)
+    if inserted:
+        await rebuild_mutual_connections(db, touched_user_ids)  # Commits the whole batch
+    else:
+        await db.commit()
+    for row in rows:
+        adjacency_index.add_edge(row["user_id"], row["connected_user_id"])
+    for user_id in touched_user_ids:
+        strength_cache.invalidate_user(user_id)
+    return inserted
+
+
+async def bulk_create_user_passions(db: AsyncSession, user_passion_links: List[UserPassionCreate]) -> int:
+    rows = _unique_rows([link.dict() for link in user_passion_links], ["user_id", "passion_id"])
+    inserted = await _insert_ignoring_conflicts(db, user_passions, rows, ["user_id", "passion_id"])
+    await refresh_connection_strengths(db, {row["user_id"] for row in rows})
+    await db.commit()
+    for user_id in {row["user_id"] for row in rows}:
+        strength_cache.invalidate_user(user_id)
+    return inserted
+
+
+async def bulk_create_group_memberships(db: AsyncSession, group_memberships: List[GroupMembershipCreate]) -> int:
+    rows = _unique_rows([membership.dict() for membership in group_memberships], ["user_id", "group_id"])
+    inserted = await _insert_ignoring_conflicts(db, GroupMembership.__table__, rows, ["user_id", "group_id"])
+    await refresh_connection_strengths(db, {row["user_id"] for row in rows})
+    await db.commit()
+    for user_id in {row["user_id"] for row in rows}:
+        strength_cache.invalidate_user(user_id)
+    return inserted
+
+
+async def bulk_create_event_attendees(db: AsyncSession, event_attendee_links: List[EventAttendeeCreate]) -> int:
+    rows = _unique_rows([attendee.dict() for attendee in event_attendee_links], ["event_id", "user_id"])
+    inserted = await _insert_ignoring_conflicts(db, event_attendees, rows, ["event_id", "user_id"])
+    await db.commit()
+    return inserted
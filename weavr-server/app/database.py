@@ -1,22 +1,221 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
-from sqlalchemy.pool import NullPool
+import threading
+import time
+
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.config import settings
 
-# Create the async engine
-engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+
+# --- Pool Metrics ---
+class PoolMetrics:
+    """
+    Counters for connection acquisition: how many checkouts, how long they waited for a free
+    connection, how often the pool had to open overflow connections and how often it timed out.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.overflow_events = 0
+        self.timeouts = 0
+
+    def record_checkout(self, wait: float, overflowed: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            if overflowed:
+                self.overflow_events += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "avg_wait_ms": self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+            }
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that reports acquisition wait time, overflow connections and timeouts to its metrics.
+    """
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        overflow = self.overflow()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start, self.overflow() > max(overflow, 0))
+        return connection
+
+
+def _engine_options(name: str) -> dict:
+    if settings.DB_POOL_CLASS == "null":
+        return {"poolclass": NullPool}
+    if settings.DB_POOL_CLASS != "queue":
+        raise ValueError(f"Unsupported DB_POOL_CLASS: {settings.DB_POOL_CLASS}")
+    # One pool class per engine, so each keeps its own metrics across pool.recreate()
+    pool_class = type(f"{name.title()}QueuePool", (MeteredQueuePool,), {"metrics": PoolMetrics()})
+    return {
+        "poolclass": pool_class,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+
+# Create the async engines
+engine = create_async_engine(settings.DATABASE_URL, **_engine_options("primary"))
+read_engine = (create_async_engine(settings.READ_DATABASE_URL, **_engine_options("replica"))
+               if settings.READ_DATABASE_URL else None)
 test_engine = create_async_engine(settings.TEST_DATABASE_URL, poolclass=NullPool)
 
-# Create the sessionmaker for async sessions
+
+# --- Read Replica Routing ---
+class ReplicaHealth:
+    """
+    Circuit breaker for the read replica: after an error, reads go to the primary for
+    READ_REPLICA_RETRY_SECONDS before the replica is tried again.
+    """
+
+    def __init__(self):
+        self._down_until = 0.0
+        self.failures = 0
+
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def mark_down(self) -> None:
+        self._down_until = time.monotonic() + settings.READ_REPLICA_RETRY_SECONDS
+        self.failures += 1
+
+
+replica_health = ReplicaHealth()
+
+
+class RoutingSession(Session):
+    """
+    Sends reads to the replica until the session writes; from then on every statement goes to
+    the primary, so a request always reads its own writes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.use_primary = False
+
+    def reads_from_replica(self) -> bool:
+        return read_engine is not None and not self.use_primary and replica_health.available()
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.use_primary = True
+        if self.reads_from_replica():
+            return read_engine.sync_engine
+        return engine.sync_engine
+
+
+class ReadSession(AsyncSession):
+    """
+    Async session over RoutingSession. A connection error on the replica marks it down and
+    retries the statement once on the primary.
+    """
+    sync_session_class = RoutingSession
+
+    async def _with_fallback(self, method, *args, **kwargs):
+        try:
+            return await method(*args, **kwargs)
+        except (OperationalError, InterfaceError, OSError):
+            if not self.sync_session.reads_from_replica():
+                raise
+            replica_health.mark_down()
+            await self.rollback()
+            self.sync_session.use_primary = True
+            return await method(*args, **kwargs)
+
+    async def execute(self, *args, **kwargs):
+        return await self._with_fallback(super().execute, *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await self._with_fallback(super().scalar, *args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        return await self._with_fallback(super().scalars, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self._with_fallback(super().get, *args, **kwargs)
+
+
+# Create the sessionmakers for async sessions
 async_session = async_sessionmaker(bind=engine, expire_on_commit=False)
+read_session = async_sessionmaker(bind=engine, class_=ReadSession, expire_on_commit=False)
 TestSessionLocal = async_sessionmaker(bind=test_engine, expire_on_commit=False)
 
 
+def _pool_stats(pool) -> dict:
+    stats = {"pool_class": type(pool).__name__}
+    if isinstance(pool, MeteredQueuePool):
+        stats.update({
+            "pool_size": pool.size(),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+        stats.update(pool.metrics.stats())
+    return stats
+
+
+def pool_stats() -> dict:
+    """
+    Current state of each engine's pool plus its acquisition counters, for sizing
+    DB_POOL_SIZE and DB_MAX_OVERFLOW against the worker count.
+    """
+    stats = {"primary": _pool_stats(engine.sync_engine.pool)}
+    if read_engine is not None:
+        stats["replica"] = _pool_stats(read_engine.sync_engine.pool)
+        stats["replica"].update({"available": replica_health.available(), "failures": replica_health.failures})
+    return stats
+
+
 async def get_db():
     async with async_session() as session:
         yield session
 
 
+async def get_read_db():
+    async with read_session() as session:
+        yield session
+
+
 async def override_get_db():
     async with TestSessionLocal() as session:
         yield session
+
+
+def dialect_insert(db, table):
+    """
+    INSERT construct for the session's dialect, so callers can add ON CONFLICT clauses.
+    """
+    if db.bind.dialect.name == "postgresql":
+        return postgresql_insert(table)
+    return sqlite_insert(table)
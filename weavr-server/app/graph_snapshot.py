@@ -0,0 +1,163 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Connection
+from app.network import bfs_distances, bidirectional_search
+
+# Header: magic, format version, node count, edge count, build time (unix seconds).
+# Arrays follow as native-endian int32: node_ids[n], offsets[n + 1], neighbours[e], strengths[e].
+# Snapshots are meant to be shared by workers on the same host, so native byte order is fine.
+MAGIC = b"WVRCSR\x00\x00"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("=8sIIIq4x")
+
+
+# --- Snapshot Build ---
+async def build_graph_snapshot(db: AsyncSession, path: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Write a compressed-sparse-row snapshot of the connections table to path.
+    Connections are stored in both directions; the file is swapped in atomically.
+    Returns the node and (directed) edge counts.
+    """
+    path = path or settings.GRAPH_SNAPSHOT_PATH
+
+    adjacency: Dict[int, Dict[int, int]] = {}
+    rows = await db.execute(select(Connection.user_id, Connection.connected_user_id, Connection.connection_strength))
+    for user_id, connected_user_id, strength in rows:
+        if user_id == connected_user_id:
+            continue
+        strength = strength or 0
+        for source, target in ((user_id, connected_user_id), (connected_user_id, user_id)):
+            neighbours = adjacency.setdefault(source, {})
+            neighbours[target] = max(strength, neighbours.get(target, 0))
+
+    node_ids = array("i", sorted(adjacency))
+    position = {user_id: index for index, user_id in enumerate(node_ids)}
+    offsets = array("i", [0])
+    neighbours = array("i")
+    strengths = array("i")
+    for user_id in node_ids:
+        for connected_user_id in sorted(adjacency[user_id]):
+            neighbours.append(position[connected_user_id])
+            strengths.append(adjacency[user_id][connected_user_id])
+        offsets.append(len(neighbours))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(node_ids), len(neighbours), int(time.time())))
+        for values in (node_ids, offsets, neighbours, strengths):
+            values.tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)  # Readers see either the old file or the new one, never a partial write
+
+    return len(node_ids), len(neighbours)
+
+
+# --- Snapshot Reader ---
+class GraphSnapshot:
+    """
+    Read-only, memory-mapped CSR snapshot. Every worker mapping the same file shares
+    one physical copy of the graph through the page cache.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identity = (stat.st_ino, stat.st_mtime_ns)
+
+        magic, version, node_count, edge_count, built_at = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Weavr graph snapshot.")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported graph snapshot version {version} in {path}.")
+        self.node_count = node_count
+        self.edge_count = edge_count
+        self.built_at = built_at
+
+        view = memoryview(self._mmap)
+        start = HEADER.size
+        arrays = []
+        for length in (node_count, node_count + 1, edge_count, edge_count):
+            arrays.append(view[start:start + length * 4].cast("i"))
+            start += length * 4
+        self._node_ids, self._offsets, self._neighbours, self._strengths = arrays
+
+    def _index_of(self, user_id: int) -> Optional[int]:
+        index = bisect_left(self._node_ids, user_id)
+        if index < self.node_count and self._node_ids[index] == user_id:
+            return index
+        return None
+
+    def _neighbour_indices(self, index: int) -> memoryview:
+        return self._neighbours[self._offsets[index]:self._offsets[index + 1]]
+
+    def neighbours(self, user_id: int) -> List[int]:
+        index = self._index_of(user_id)
+        if index is None:
+            return []
+        return [self._node_ids[neighbour] for neighbour in self._neighbour_indices(index)]
+
+    def neighbour_strengths(self, user_id: int) -> Dict[int, int]:
+        index = self._index_of(user_id)
+        if index is None:
+            return {}
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return {self._node_ids[neighbour]: strength
+                for neighbour, strength in zip(self._neighbours[start:end], self._strengths[start:end])}
+
+    def degree_of_separation(self, user1_id: int, user2_id: int, max_depth: int) -> Optional[int]:
+        if user1_id == user2_id:
+            return 0
+        source, target = self._index_of(user1_id), self._index_of(user2_id)
+        if source is None or target is None:
+            return None
+        return bidirectional_search(self._neighbour_indices, source, target, max_depth)
+
+    def degrees_of_separation(self, user_id: int, target_user_ids: Iterable[int], max_depth: int) -> Dict[int, int]:
+        source = self._index_of(user_id)
+        if source is None:
+            return {user_id: 0} if user_id in set(target_user_ids) else {}
+        targets = {}
+        for target_user_id in target_user_ids:
+            index = self._index_of(target_user_id)
+            if index is not None:
+                targets[index] = target_user_id
+        distances = bfs_distances(self._neighbour_indices, source, targets, max_depth)
+        return {targets[index]: depth for index, depth in distances.items()}
+
+
+_lock = threading.Lock()
+_current: Optional[GraphSnapshot] = None
+
+
+def current_snapshot() -> Optional[GraphSnapshot]:
+    """
+    The latest snapshot at GRAPH_SNAPSHOT_PATH, remapped whenever a rebuild has swapped the file.
+    Returns None if no snapshot has been built yet.
+    """
+    global _current
+    try:
+        stat = os.stat(settings.GRAPH_SNAPSHOT_PATH)
+    except FileNotFoundError:
+        return None
+
+    snapshot = _current
+    if snapshot is not None and snapshot.identity == (stat.st_ino, stat.st_mtime_ns):
+        return snapshot
+
+    with _lock:
+        if _current is None or _current.identity != (stat.st_ino, stat.st_mtime_ns):
+            _current = GraphSnapshot(settings.GRAPH_SNAPSHOT_PATH)
+        return _current
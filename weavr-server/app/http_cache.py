@@ -0,0 +1,81 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, NamedTuple, Optional
+
+from fastapi import Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Post, User, WeavrWisdom
+
+
+class ResourceVersion(NamedTuple):
+    etag: str
+    last_modified: Optional[datetime]
+
+
+# --- Version Columns ---
+# Every column whose change alters the response, other than columns edited alongside updated_at.
+# Post and wisdom counters change without touching updated_at, so they are part of the ETag.
+VERSION_COLUMNS = {
+    Post: (Post.id, Post.created_at, Post.updated_at, Post.like_count, Post.comment_count),
+    User: (User.id, User.created_at, User.updated_at),
+    WeavrWisdom: (WeavrWisdom.id, WeavrWisdom.created_at, WeavrWisdom.updated_at, WeavrWisdom.up_votes,
+                  WeavrWisdom.down_votes),
+}
+
+
+def resource_version(model, row) -> ResourceVersion:
+    """
+    Version of a row, from a loaded ORM object or a row of VERSION_COLUMNS[model].
+    """
+    values = [getattr(row, column.key) for column in VERSION_COLUMNS[model]]
+    digest = hashlib.blake2b(repr(values).encode(), digest_size=8).hexdigest()
+    return ResourceVersion(f'"{digest}"', row.updated_at or row.created_at)
+
+
+async def fetch_version(db: AsyncSession, model, row_id: int) -> Optional[ResourceVersion]:
+    """
+    Version of one row, reading only its version columns. None if the row does not exist.
+    """
+    row = (await db.execute(select(*VERSION_COLUMNS[model]).where(model.id == row_id))).first()
+    return resource_version(model, row) if row else None
+
+
+# --- Conditional Requests ---
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def not_modified(request: Request, version: ResourceVersion) -> bool:
+    """
+    Whether a GET can be answered with 304. If-None-Match wins over If-Modified-Since, as in RFC 9110.
+    Last-Modified only tracks updated_at, so clients that want fresh counters should send the ETag.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or version.etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or version.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False  # Unparseable dates are ignored
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second precision
+    return version.last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+
+def cache_headers(version: ResourceVersion) -> Dict[str, str]:
+    """
+    Validators for a response, with no-cache so clients revalidate on every use instead of trusting a stale copy.
+    """
+    headers = {"ETag": version.etag, "Cache-Control": "private, no-cache"}
+    if version.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(version.last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
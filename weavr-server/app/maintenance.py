@@ -0,0 +1,142 @@
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import select
+
+from app.create_tables import create_database
+from app.crud import (
+    rebuild_connection_strengths, rebuild_mutual_connections, rebuild_notification_counters, rebuild_timelines,
+    reconcile_engagement_counters,
+)
+from app.database import async_session, engine
+from app.graph_snapshot import build_graph_snapshot
+from app.models import User
+from app.query_audit import audit_hot_queries, sample_ids, seed_audit_data
+from app.query_budget import check_endpoint_budgets
+from app.services import compare_connection_strength_paths
+
+logger = logging.getLogger(__name__)
+
+
+async def create_tables_command(args):
+    await create_database()
+    logger.info("Created missing tables and recorded the schema version.")
+
+
+async def rebuild_connection_strengths_command(args):
+    async with async_session() as session:
+        count = await rebuild_connection_strengths(session)
+    logger.info(f"Recomputed the stored strength of {count} connections.")
+
+
+async def rebuild_mutual_connections_command(args):
+    async with async_session() as session:
+        count = await rebuild_mutual_connections(session)
+    logger.info(f"Rebuilt {count} mutual connection rows.")
+
+
+async def rebuild_notification_counters_command(args):
+    async with async_session() as session:
+        count = await rebuild_notification_counters(session)
+    logger.info(f"Rebuilt unread notification counters for {count} users.")
+
+
+async def rebuild_timelines_command(args):
+    async with async_session() as session:
+        count = await rebuild_timelines(session)
+    logger.info(f"Rebuilt home timelines with {count} entries.")
+
+
+async def reconcile_counters_command(args):
+    async with async_session() as session:
+        count = await reconcile_engagement_counters(session)
+    logger.info(f"Repaired {count} duplicate likes and drifted like/comment counters.")
+
+
+async def build_graph_snapshot_command(args):
+    async with async_session() as session:
+        node_count, edge_count = await build_graph_snapshot(session)
+    logger.info(f"Wrote graph snapshot with {node_count} users and {edge_count} directed edges.")
+
+
+async def audit_queries_command(args):
+    async with engine.connect() as conn:
+        if args.seed_users:
+            await seed_audit_data(conn, args.seed_users)
+            await conn.commit()
+            logger.info(f"Seeded audit data for {args.seed_users} users.")
+        results = await audit_hot_queries(conn)  # Rolled back on close, which also resets the planner settings
+
+    flagged = [result for result in results if result.sequential_scans]
+    for result in results:
+        status = "SEQ SCAN" if result.sequential_scans else "ok"
+        logger.info(f"{result.name}: {status}")
+        for line in result.sequential_scans:
+            logger.info(f"    {line}")
+    logger.info(f"{len(flagged)} of {len(results)} hot queries use a sequential scan.")
+    if flagged:
+        raise SystemExit(1)
+
+
+async def check_query_budgets_command(args):
+    from main import app  # Imported here so the other commands do not load the web app
+
+    async with engine.connect() as conn:
+        if args.seed_users:
+            await seed_audit_data(conn, args.seed_users)
+            await conn.commit()
+            logger.info(f"Seeded audit data for {args.seed_users} users.")
+        ids = await sample_ids(conn)
+    results = await check_endpoint_budgets(app, ids)
+
+    flagged = [result for result in results if result.failed]
+    for result in results:
+        status = "OVER BUDGET" if result.over_budget else "HTTP ERROR" if result.failed else "ok"
+        logger.info(f"{result.path}: {len(result.statements)}/{result.budget} statements, "
+                    f"HTTP {result.status_code}, {status}")
+        if result.over_budget:
+            for statement in result.statements:
+                logger.info(f"    {' '.join(statement.split())}")
+    logger.info(f"{len(flagged)} of {len(results)} endpoints fail or exceed their statement budget.")
+    if flagged:
+        raise SystemExit(1)
+
+
+async def check_connection_strength_command(args):
+    async with async_session() as session:
+        user_ids = (await session.scalars(select(User.id).order_by(User.id).limit(51))).all()
+        if not user_ids:
+            logger.info("No users to compare.")
+            return
+        mismatches = await compare_connection_strength_paths(session, user_ids[0], user_ids[1:])
+    for candidate_id, (scalar, batch) in mismatches.items():
+        logger.info(f"User {user_ids[0]} -> {candidate_id}: scalar {scalar}, batch {batch}")
+    logger.info(f"{len(mismatches)} of {len(user_ids) - 1} pairs differ between the scalar and batch strength paths.")
+    if mismatches:
+        raise SystemExit(1)
+
+
+COMMANDS = {
+    "create-tables": create_tables_command,
+    "rebuild-connection-strengths": rebuild_connection_strengths_command,
+    "rebuild-mutual-connections": rebuild_mutual_connections_command,
+    "rebuild-notification-counters": rebuild_notification_counters_command,
+    "rebuild-timelines": rebuild_timelines_command,
+    "reconcile-counters": reconcile_counters_command,
+    "build-graph-snapshot": build_graph_snapshot_command,
+    "check-connection-strength": check_connection_strength_command,
+    "audit-queries": audit_queries_command,
+    "check-query-budgets": check_query_budgets_command,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Weavr maintenance commands.")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--seed-users", type=int, default=0,
+                        help="audit-queries, check-query-budgets: seed a scratch database with this many "
+                             "synthetic users first.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(COMMANDS[args.command](args))
@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Any
 
 from sqlalchemy import (
-    Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Enum, Table, Index, Date
+    Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Enum, Table, Index, Date, text
 )
 from sqlalchemy import Enum as SQLAlchemyEnum
 from sqlalchemy.ext.declarative import declarative_base
@@ -11,6 +11,9 @@ from sqlalchemy.orm import relationship
 
 Base = declarative_base()
 
+# Bump whenever a model, column or index changes, so workers refuse to start against an older schema
+SCHEMA_VERSION = 9
+
 
 # --- Enumerated Types ---
 class IntroductionStatus(enum.Enum):
@@ -61,17 +64,30 @@ class Connection(Base):
     __tablename__ = "connections"
     __table_args__ = (
         Index('connection_idx', 'user_id', 'connected_user_id', unique=True),
+        Index('connection_reverse_idx', 'connected_user_id', 'user_id'),
     )
 
     user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
     connected_user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
-    connection_strength = Column(Integer, default=1)
+    connection_strength = Column(Integer, default=1)  # Maintained by crud.refresh_connection_strengths
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", foreign_keys=[user_id], back_populates="connections")
     connected_user = relationship("User", foreign_keys=[connected_user_id], back_populates="connected_to")
 
 
+# MutualConnection Model
+class MutualConnection(Base):
+    __tablename__ = "mutual_connections"
+    __table_args__ = (
+        Index('mutual_connection_user_b_idx', 'user_b'),
+    )
+
+    user_a = Column(Integer, ForeignKey("users.id"), primary_key=True)  # Always the smaller user id of the pair
+    user_b = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
 # User Model
 class User(Base):
     __tablename__ = "users"
@@ -120,6 +136,9 @@ class User(Base):
 # UserActivity Model
 class UserActivity(Base):
     __tablename__ = 'user_activity'
+    __table_args__ = (
+        Index('user_activity_user_date_idx', 'user_id', 'date'),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     date = Column(Date, nullable=False)
@@ -158,6 +177,8 @@ user_passions = Table(
     Base.metadata,
     Column("user_id", Integer, ForeignKey("users.id"), index=True),
     Column("passion_id", Integer, ForeignKey("passions.id"), index=True),
+    Index('user_passion_passion_user_idx', 'passion_id', 'user_id'),
+    Index('user_passion_unique_idx', 'user_id', 'passion_id', unique=True),
 )
 
 
@@ -176,6 +197,9 @@ class Goal(Base):
 # Introduction Model
 class Introduction(Base):
     __tablename__ = "introductions"
+    __table_args__ = (
+        Index('introduction_target_status_idx', 'target_user_id', 'status'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     introducer_id = Column(Integer, ForeignKey("users.id"), index=True)
@@ -193,6 +217,9 @@ class Introduction(Base):
 # Group Model
 class GroupMembership(Base):
     __tablename__ = "group_memberships"
+    __table_args__ = (
+        Index('group_membership_group_idx', 'group_id', 'user_id'),
+    )
     user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
     group_id = Column(Integer, ForeignKey("groups.id"), primary_key=True)
     role = Column(SQLAlchemyEnum(GroupMemberRole), default=GroupMemberRole.member)
@@ -247,6 +274,10 @@ class Leaderboard(Base):
 # Leaderboard Entry Model
 class LeaderboardEntry(Base):
     __tablename__ = "leaderboard_entries"
+    __table_args__ = (
+        Index('leaderboard_entry_score_idx', 'leaderboard_id', 'score'),
+        Index('leaderboard_entry_user_idx', 'leaderboard_id', 'user_id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     leaderboard_id = Column(Integer, ForeignKey("leaderboards.id"), index=True)
@@ -303,12 +334,18 @@ event_attendees = Table(
     Column("user_id", Integer, ForeignKey("users.id"), index=True),
     Column("rsvp_status", Enum(RSVPStatus), default=RSVPStatus.interested),
     Column("attended_at", DateTime),  # Make attended_at nullable, as not everyone who RSVPs will attend
+    Index('event_attendee_unique_idx', 'event_id', 'user_id', unique=True),
 )
 
 
 # Notification Model
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index('notification_user_created_idx', 'user_id', 'created_at', 'id'),
+        Index('notification_unread_idx', 'user_id', postgresql_where=text("NOT is_read"),
+              sqlite_where=text("is_read = 0")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
@@ -319,9 +356,21 @@ class Notification(Base):
     user = relationship("User", back_populates="notifications")
 
 
+# NotificationCounter Model
+class NotificationCounter(Base):
+    __tablename__ = "notification_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+
+
 # Message Model
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Each direction of a conversation is one range of this index
+        Index('message_conversation_idx', 'sender_id', 'receiver_id', 'sent_at', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     sender_id = Column(Integer, ForeignKey("users.id"), index=True)
@@ -336,27 +385,64 @@ class Message(Base):
 # Post Model
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        Index('post_created_idx', 'created_at', 'id'),
+        Index('post_author_created_idx', 'author_id', 'created_at', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     author_id = Column(Integer, ForeignKey("users.id"), index=True)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, onupdate=datetime.utcnow)
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")  # Maintained by like CRUD
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")  # Maintained by comment CRUD
 
     author = relationship("User", back_populates="posts")
     comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan")
     likes = relationship("Like", back_populates="post", cascade="all, delete-orphan")
 
 
+# TimelineEntry Model
+class TimelineEntry(Base):
+    __tablename__ = "timeline_entries"
+    __table_args__ = (
+        # A home feed page is one range of this index
+        Index('timeline_user_created_idx', 'user_id', 'created_at', 'post_id'),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime, nullable=False)  # Copy of the post's created_at, so pages sort without a join
+
+
+# FanoutOnReadAuthor Model
+class FanoutOnReadAuthor(Base):
+    __tablename__ = "fanout_on_read_authors"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    audience_size = Column(Integer, nullable=False)
+
+
 # Comment Model
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index('comment_post_created_idx', 'post_id', 'created_at', 'id'),
+        # Top-level comments of a post, and the replies of each comment, are each one range of an index
+        Index('comment_post_thread_idx', 'post_id', 'created_at', 'id', postgresql_where=text("parent_id IS NULL"),
+              sqlite_where=text("parent_id IS NULL")),
+        Index('comment_parent_created_idx', 'parent_id', 'created_at', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     post_id = Column(Integer, ForeignKey("posts.id"), index=True)
+    parent_id = Column(Integer, ForeignKey("comments.id", ondelete="CASCADE"))  # Set on replies to a top-level comment
     author_id = Column(Integer, ForeignKey("users.id"), index=True)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")  # Maintained by like CRUD
+    reply_count = Column(Integer, nullable=False, default=0, server_default="0")  # Maintained by comment CRUD
 
     post = relationship("Post", back_populates="comments")
     author = relationship("User", back_populates="comments")
@@ -366,6 +452,14 @@ class Comment(Base):
 # Like Model
 class Like(Base):
     __tablename__ = "likes"
+    __table_args__ = (
+        # A like targets either a post or a comment, so each lookup only needs the rows for its target type.
+        # Unique, so a user likes a target at most once and concurrent inserts resolve with ON CONFLICT.
+        Index('like_user_post_unique_idx', 'user_id', 'post_id', unique=True,
+              postgresql_where=text("post_id IS NOT NULL"), sqlite_where=text("post_id IS NOT NULL")),
+        Index('like_user_comment_unique_idx', 'user_id', 'comment_id', unique=True,
+              postgresql_where=text("comment_id IS NOT NULL"), sqlite_where=text("comment_id IS NOT NULL")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     post_id = Column(Integer, ForeignKey("posts.id"), index=True)
@@ -393,6 +487,9 @@ class UserSettings(Base):
 # Feedback Model
 class Feedback(Base):
     __tablename__ = "feedback"
+    __table_args__ = (
+        Index('feedback_created_idx', 'created_at', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
@@ -405,6 +502,9 @@ class Feedback(Base):
 # Report Model
 class Report(Base):
     __tablename__ = "reports"
+    __table_args__ = (
+        Index('report_created_idx', 'created_at', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
@@ -426,3 +526,11 @@ class NotificationSettings(Base):
     sms_notifications = Column(Boolean, default=False)
 
     user = relationship("User", back_populates="notification_settings")
+
+
+# SchemaVersion Model
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True)
+    applied_at = Column(DateTime, default=datetime.utcnow)
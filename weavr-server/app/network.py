@@ -0,0 +1,136 @@
+import threading
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Connection
+
+Neighbours = Callable[[int], Iterable[int]]
+
+
+# --- Graph Search ---
+def _expand(neighbours: Neighbours, frontier: List[int], seen: Set[int], other_seen: Set[int]) -> Tuple[List[int], bool]:
+    next_frontier = []
+    met = False
+    for node in frontier:
+        for neighbour in neighbours(node):
+            if neighbour in seen:
+                continue
+            if neighbour in other_seen:
+                met = True
+            seen.add(neighbour)
+            next_frontier.append(neighbour)
+    return next_frontier, met
+
+
+def bidirectional_search(neighbours: Neighbours, source: int, target: int, max_depth: int) -> Optional[int]:
+    """
+    Number of hops between source and target, or None if they are more than max_depth apart.
+    Always expands the smaller of the two frontiers.
+    """
+    if source == target:
+        return 0
+
+    source_seen, target_seen = {source}, {target}
+    source_frontier, target_frontier = [source], [target]
+    source_depth = target_depth = 0
+
+    while source_frontier and target_frontier and source_depth + target_depth < max_depth:
+        if len(source_frontier) <= len(target_frontier):
+            source_frontier, met = _expand(neighbours, source_frontier, source_seen, target_seen)
+            source_depth += 1
+        else:
+            target_frontier, met = _expand(neighbours, target_frontier, target_seen, source_seen)
+            target_depth += 1
+        if met:
+            return source_depth + target_depth
+
+    return None
+
+
+def bfs_distances(neighbours: Neighbours, source: int, targets: Iterable[int], max_depth: int) -> Dict[int, int]:
+    """
+    Hop counts from source to each reachable target within max_depth.
+    Expands the source neighbourhood once and stops as soon as every target has been found.
+    """
+    remaining = set(targets)
+    distances = {}
+    if source in remaining:
+        distances[source] = 0
+        remaining.discard(source)
+
+    seen = {source}
+    frontier = [source]
+    depth = 0
+    while frontier and remaining and depth < max_depth:
+        depth += 1
+        next_frontier = []
+        for node in frontier:
+            for neighbour in neighbours(node):
+                if neighbour in seen:
+                    continue
+                seen.add(neighbour)
+                next_frontier.append(neighbour)
+                if neighbour in remaining:
+                    distances[neighbour] = depth
+                    remaining.discard(neighbour)
+        frontier = next_frontier
+
+    return distances
+
+
+# --- Adjacency Index ---
+class AdjacencyIndex:
+    """
+    Process-local, undirected view of the connections table.
+    Neighbour sets are replaced rather than mutated, so readers never need the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._adjacency: Dict[int, FrozenSet[int]] = {}
+        self._edges: Set[Tuple[int, int]] = set()
+        self.loaded = False
+
+    async def load(self, db: AsyncSession) -> None:
+        edges = set((await db.execute(select(Connection.user_id, Connection.connected_user_id))).tuples().all())
+        adjacency: Dict[int, Set[int]] = {}
+        for user_id, connected_user_id in edges:
+            adjacency.setdefault(user_id, set()).add(connected_user_id)
+            adjacency.setdefault(connected_user_id, set()).add(user_id)
+
+        with self._lock:
+            self._edges = edges
+            self._adjacency = {user_id: frozenset(neighbours) for user_id, neighbours in adjacency.items()}
+            self.loaded = True
+
+    def add_edge(self, user_id: int, connected_user_id: int) -> None:
+        if not self.loaded:
+            return
+        with self._lock:
+            self._edges.add((user_id, connected_user_id))
+            self._adjacency[user_id] = self._adjacency.get(user_id, frozenset()) | {connected_user_id}
+            self._adjacency[connected_user_id] = self._adjacency.get(connected_user_id, frozenset()) | {user_id}
+
+    def remove_edge(self, user_id: int, connected_user_id: int) -> None:
+        if not self.loaded:
+            return
+        with self._lock:
+            self._edges.discard((user_id, connected_user_id))
+            if (connected_user_id, user_id) in self._edges:
+                return  # Still connected through the reverse row
+            self._adjacency[user_id] = self._adjacency.get(user_id, frozenset()) - {connected_user_id}
+            self._adjacency[connected_user_id] = self._adjacency.get(connected_user_id, frozenset()) - {user_id}
+
+    def neighbours(self, user_id: int) -> FrozenSet[int]:
+        return self._adjacency.get(user_id, frozenset())
+
+    def degree_of_separation(self, user1_id: int, user2_id: int, max_depth: int) -> Optional[int]:
+        return bidirectional_search(self.neighbours, user1_id, user2_id, max_depth)
+
+    def degrees_of_separation(self, user_id: int, target_user_ids: Iterable[int], max_depth: int) -> Dict[int, int]:
+        return bfs_distances(self.neighbours, user_id, target_user_ids, max_depth)
+
+
+adjacency_index = AdjacencyIndex()
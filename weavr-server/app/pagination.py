@@ -0,0 +1,61 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+# --- Cursors ---
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    payload = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid pagination cursor.")
+
+
+# --- Keyset Pagination ---
+async def fetch_page(db: AsyncSession, query: Select, sort_column, id_column, cursor: Optional[str] = None,
+                     skip: int = 0, limit: int = 100, columns: Optional[Sequence] = None,
+                     oldest_first: bool = False) -> Page:
+    """
+    Fetch one page of query, newest first on (sort_column, id_column), or oldest first with oldest_first.
+    With a cursor the page starts strictly after the cursor's row, so deep pages cost the same as the first
+    and rows inserted mid-scroll are never repeated; without one, skip is applied as a plain offset.
+    next_cursor is None on the last page.
+    With columns, the query selects just those columns and the items are Core rows instead of ORM objects;
+    the columns must include sort_column and id_column.
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        key, after = tuple_(sort_column, id_column), tuple_(sort_value, row_id)
+        query = query.where(key > after if oldest_first else key < after)
+    elif skip:
+        query = query.offset(skip)
+
+    order = (sort_column.asc(), id_column.asc()) if oldest_first else (sort_column.desc(), id_column.desc())
+    query = query.order_by(*order).limit(limit + 1)
+    if columns is not None:
+        rows = (await db.execute(query.with_only_columns(*columns))).all()
+    else:
+        rows = (await db.scalars(query)).all()
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit and items:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return Page(items, next_cursor)
@@ -0,0 +1,175 @@
+import random
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.models import (
+    User, Connection, Introduction, GroupMembership, Group, LeaderboardEntry, Leaderboard, Notification,
+    Message, Post, Comment, Like, UserActivity, Passion, user_passions, IntroductionStatus, Feedback, Report,
+    TimelineEntry
+)
+
+PAGE_SIZE = 100
+
+
+class AuditResult(NamedTuple):
+    name: str
+    plan: List[str]
+    sequential_scans: List[str]
+
+
+# --- Hot Queries ---
+# Each builder mirrors the query shape used in crud.py/services.py, parameterised with sample ids.
+HOT_QUERIES: Dict[str, Callable[[dict], object]] = {
+    "conversation": lambda ids: select(Message).where(
+        ((Message.sender_id == ids["user_id"]) & (Message.receiver_id == ids["other_user_id"])) |
+        ((Message.sender_id == ids["other_user_id"]) & (Message.receiver_id == ids["user_id"]))
+    ).order_by(Message.sent_at, Message.id).limit(PAGE_SIZE),
+    "notifications_for_user": lambda ids: select(Notification).where(
+        Notification.user_id == ids["user_id"]
+    ).order_by(Notification.created_at.desc(), Notification.id.desc()).limit(PAGE_SIZE),
+    "unread_notifications": lambda ids: select(func.count()).select_from(Notification).where(
+        Notification.user_id == ids["user_id"], Notification.is_read == False),  # noqa: E712
+    "like_for_post": lambda ids: select(Like).where(Like.user_id == ids["user_id"], Like.post_id == ids["post_id"]),
+    "like_for_comment": lambda ids: select(Like).where(Like.user_id == ids["user_id"],
+                                                       Like.comment_id == ids["comment_id"]),
+    "user_streak": lambda ids: select(UserActivity).where(
+        UserActivity.user_id == ids["user_id"]).order_by(UserActivity.date.desc()),
+    "leaderboard_ranking": lambda ids: select(LeaderboardEntry).where(
+        LeaderboardEntry.leaderboard_id == ids["leaderboard_id"]).order_by(LeaderboardEntry.score.desc()),
+    "leaderboard_user_rank": lambda ids: select(LeaderboardEntry).where(
+        LeaderboardEntry.leaderboard_id == ids["leaderboard_id"], LeaderboardEntry.user_id == ids["user_id"]),
+    "posts_feed": lambda ids: select(Post).order_by(Post.created_at.desc(), Post.id.desc()).limit(PAGE_SIZE),
+    "home_timeline": lambda ids: select(TimelineEntry.post_id).where(TimelineEntry.user_id == ids["user_id"])
+    .order_by(TimelineEntry.created_at.desc(), TimelineEntry.post_id.desc()).limit(PAGE_SIZE),
+    "posts_by_author": lambda ids: select(Post).where(Post.author_id == ids["user_id"])
+    .order_by(Post.created_at.desc(), Post.id.desc()).limit(PAGE_SIZE),
+    "comments_for_post": lambda ids: select(Comment).where(
+        Comment.post_id == ids["post_id"]).order_by(Comment.created_at.desc(), Comment.id.desc()).limit(PAGE_SIZE),
+    "comment_threads": lambda ids: select(Comment).where(
+        Comment.post_id == ids["post_id"], Comment.parent_id.is_(None)
+    ).order_by(Comment.created_at.desc(), Comment.id.desc()).limit(PAGE_SIZE),
+    "comment_replies": lambda ids: select(Comment).where(Comment.parent_id == ids["comment_id"])
+    .order_by(Comment.created_at.desc(), Comment.id.desc()).limit(PAGE_SIZE),
+    "feedback_list": lambda ids: select(Feedback).order_by(Feedback.created_at.desc(), Feedback.id.desc())
+    .limit(PAGE_SIZE),
+    "reports_list": lambda ids: select(Report).order_by(Report.created_at.desc(), Report.id.desc()).limit(PAGE_SIZE),
+    "introductions_by_status": lambda ids: select(Introduction).where(
+        Introduction.target_user_id == ids["user_id"], Introduction.status == IntroductionStatus.pending),
+    "reverse_connections": lambda ids: select(Connection.user_id).where(
+        Connection.connected_user_id == ids["user_id"]),
+    "group_members": lambda ids: select(GroupMembership.user_id).where(GroupMembership.group_id == ids["group_id"]),
+    "users_by_passion": lambda ids: select(user_passions.c.user_id).where(
+        user_passions.c.passion_id == ids["passion_id"]),
+}
+
+
+# --- Seeding ---
+async def seed_audit_data(conn: AsyncConnection, users: int) -> None:
+    """
+    Fill an empty database with synthetic rows for every hot query, so plans reflect realistic
+    table sizes. Meant for a scratch database only.
+    """
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    user_ids = list(range(1, users + 1))
+
+    async def bulk(table, rows):
+        if rows:
+            await conn.execute(insert(table), rows)
+
+    await bulk(User.__table__, [{"id": i, "email": f"audit{i}@example.com", "password_hash": "x",
+                                 "first_name": "Audit", "last_name": str(i)} for i in user_ids])
+    await bulk(Passion.__table__, [{"id": i, "name": f"audit-passion-{i}"} for i in range(1, 51)])
+    await bulk(user_passions, [{"user_id": i, "passion_id": p} for i in user_ids for p in rng.sample(range(1, 51), 3)])
+    await bulk(Group.__table__, [{"id": i, "name": f"audit-group-{i}"} for i in range(1, 21)])
+    await bulk(GroupMembership.__table__, [{"user_id": i, "group_id": g}
+                                           for i in user_ids for g in rng.sample(range(1, 21), 2)])
+    edges = {(i, j) for i in user_ids for j in rng.sample(user_ids, min(10, users)) if i != j}
+    await bulk(Connection.__table__, [{"user_id": i, "connected_user_id": j, "connection_strength": rng.randint(1, 5)}
+                                      for i, j in edges])
+    await bulk(Introduction.__table__, [{"introducer_id": rng.choice(user_ids),
+                                         "introduced_user_id": rng.choice(user_ids),
+                                         "target_user_id": rng.choice(user_ids),
+                                         "status": rng.choice(list(IntroductionStatus))} for _ in user_ids])
+    await bulk(Post.__table__, [{"id": n, "author_id": rng.choice(user_ids), "content": "audit",
+                                 "created_at": now - timedelta(minutes=n)} for n in range(1, users * 5 + 1)])
+    await bulk(TimelineEntry.__table__, [{"user_id": i, "post_id": n, "created_at": now - timedelta(minutes=n)}
+                                         for n in range(1, users * 5 + 1)
+                                         for i in {rng.choice(user_ids) for _ in range(10)}])
+    await bulk(Comment.__table__, [{"id": n, "post_id": rng.randint(1, users * 5), "author_id": rng.choice(user_ids),
+                                    "content": "audit", "created_at": now - timedelta(minutes=n)}
+                                   for n in range(1, users * 10 + 1)])
+    # Sets, since a user likes each post or comment at most once
+    post_likes = {(rng.choice(user_ids), rng.randint(1, users * 5)) for _ in range(users * 10)}
+    comment_likes = {(rng.choice(user_ids), rng.randint(1, users * 10)) for _ in range(users * 10)}
+    # Separate executemany calls: every row of one call must bind the same columns
+    await bulk(Like.__table__, [{"user_id": u, "post_id": p} for u, p in sorted(post_likes)])
+    await bulk(Like.__table__, [{"user_id": u, "comment_id": c} for u, c in sorted(comment_likes)])
+    await bulk(Message.__table__, [{"sender_id": rng.choice(user_ids), "receiver_id": rng.choice(user_ids),
+                                    "content": "audit", "sent_at": now - timedelta(minutes=n)}
+                                   for n in range(users * 10)])
+    await bulk(Notification.__table__, [{"user_id": rng.choice(user_ids), "message": "audit",
+                                         "is_read": rng.random() < 0.8, "created_at": now - timedelta(minutes=n)}
+                                        for n in range(users * 20)])
+    await bulk(UserActivity.__table__, [{"user_id": i, "date": date.today() - timedelta(days=d), "activity_level": 1}
+                                        for i in user_ids for d in range(30)])
+    await bulk(Leaderboard.__table__, [{"id": i, "name": f"audit-{i}", "criteria": "Weavr Reputation"}
+                                       for i in range(1, 11)])
+    await bulk(LeaderboardEntry.__table__, [{"leaderboard_id": b, "user_id": i, "score": rng.randint(0, 1000)}
+                                            for b in range(1, 11) for i in user_ids])
+    await bulk(Feedback.__table__, [{"user_id": rng.choice(user_ids), "message": "audit",
+                                     "created_at": now - timedelta(minutes=n)} for n in range(users)])
+    await bulk(Report.__table__, [{"user_id": rng.choice(user_ids), "reason": "audit",
+                                   "created_at": now - timedelta(minutes=n)} for n in range(users)])
+
+    if conn.dialect.name == "postgresql":
+        # Rows were inserted with explicit ids, so move the serial sequences past them
+        for table, column in ((User.__table__, "id"), (Passion.__table__, "id"), (Group.__table__, "id"),
+                              (Post.__table__, "id"), (Comment.__table__, "id"), (Leaderboard.__table__, "id")):
+            await conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table.name}', '{column}'), "
+                                    f"(SELECT max({column}) FROM {table.name}))"))
+    await conn.execute(text("ANALYZE"))
+
+
+# --- Plan Audit ---
+async def sample_ids(conn: AsyncConnection) -> dict:
+    user_id = await conn.scalar(select(func.min(User.id)))
+    return {
+        "user_id": user_id,
+        "other_user_id": await conn.scalar(select(func.max(User.id))),
+        "post_id": await conn.scalar(select(func.min(Post.id))),
+        "comment_id": await conn.scalar(select(func.min(Comment.id))),
+        "leaderboard_id": await conn.scalar(select(func.min(Leaderboard.id))),
+        "group_id": await conn.scalar(select(func.min(Group.id))),
+        "passion_id": await conn.scalar(select(func.min(Passion.id))),
+    }
+
+
+def _sequential_scans(dialect: str, plan: List[str]) -> List[str]:
+    if dialect == "postgresql":
+        return [line.strip() for line in plan if "Seq Scan" in line]
+    # SQLite: "SCAN table" is a full table scan; "SCAN table USING INDEX" walks an index in order
+    return [line.strip() for line in plan if line.strip().startswith("SCAN") and "USING" not in line]
+
+
+async def audit_hot_queries(conn: AsyncConnection) -> List[AuditResult]:
+    """
+    EXPLAIN every hot query and report the ones the planner answers with a sequential scan.
+    On Postgres sequential scans are disabled for the audit, so a remaining one means no index can serve the query.
+    """
+    dialect = conn.dialect.name
+    ids = {key: value or 0 for key, value in (await sample_ids(conn)).items()}
+    explain = "EXPLAIN" if dialect == "postgresql" else "EXPLAIN QUERY PLAN"
+    if dialect == "postgresql":
+        await conn.execute(text("SET LOCAL enable_seqscan = off"))
+
+    results = []
+    for name, build in HOT_QUERIES.items():
+        sql = build(ids).compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+        rows = (await conn.exec_driver_sql(f"{explain} {sql}")).all()
+        plan = [row[0] if dialect == "postgresql" else row[-1] for row in rows]
+        results.append(AuditResult(name, plan, _sequential_scans(dialect, plan)))
+    return results
@@ -0,0 +1,120 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from sqlalchemy import event
+
+from app.database import engine, read_engine
+
+
+class StatementCounter:
+    """
+    SQL statements sent to the database while the counter is active.
+    """
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+_active_counter: ContextVar[Optional[StatementCounter]] = ContextVar("active_statement_counter", default=None)
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _active_counter.get()
+    if counter is not None:
+        counter.statements.append(statement)
+
+
+for _engine in (engine, read_engine):
+    if _engine is not None:
+        event.listen(_engine.sync_engine, "before_cursor_execute", _record_statement)
+
+
+# --- Counting ---
+@contextmanager
+def count_statements() -> Iterator[StatementCounter]:
+    """
+    Count the statements run inside the block, on either engine. The counter follows the current
+    context, so concurrent requests outside the block are not counted.
+    """
+    counter = StatementCounter()
+    token = _active_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _active_counter.reset(token)
+
+
+@contextmanager
+def assert_max_statements(max_statements: int) -> Iterator[StatementCounter]:
+    """
+    Raise AssertionError, listing the statements, if the block runs more than max_statements of them.
+    """
+    with count_statements() as counter:
+        yield counter
+    if counter.count > max_statements:
+        statements = "\n".join(f"  {statement}" for statement in counter.statements)
+        raise AssertionError(f"Expected at most {max_statements} SQL statements, got {counter.count}:\n{statements}")
+
+
+# --- Endpoint Budgets ---
+# Maximum statements per GET endpoint. Budgets are constants: a read path that loads relationships
+# lazily runs one statement per row and goes over its budget as soon as the data has more than one row.
+ENDPOINT_BUDGETS: Dict[str, int] = {
+    "/users/{user_id}": 1,
+    "/users/{user_id}/goals": 1,
+    "/users/{user_id}/connections": 1,
+    "/users/{user_id}/introductions": 1,
+    "/users/{user_id}/group_memberships": 1,
+    "/users/{user_id}/badges": 1,
+    "/users/{user_id}/notifications": 1,
+    "/users/{user_id}/notifications/unread_count": 1,
+    "/users/{user_id}/network/mutual/{other_user_id}": 1,
+    "/users/{user_id}/network/suggested_connections": 2,
+    "/users/{user_id}/network/streak": 1,
+    "/groups/{group_id}/members": 2,
+    "/leaderboards/{leaderboard_id}/entries": 1,
+    "/posts/": 1,
+    "/posts/{post_id}": 1,
+    "/users/{user_id}/feed": 1,
+    "/posts/{post_id}/comments": 1,
+    "/posts/{post_id}/threads": 2,
+    "/comments/{comment_id}/replies": 1,
+}
+
+
+class BudgetResult(NamedTuple):
+    path: str
+    status_code: int
+    statements: List[str]
+    budget: int
+
+    @property
+    def over_budget(self) -> bool:
+        return len(self.statements) > self.budget
+
+    @property
+    def failed(self) -> bool:
+        # An error response stops early, so its statement count says nothing about the endpoint
+        return not 200 <= self.status_code < 300 or self.over_budget
+
+
+async def check_endpoint_budgets(app, ids: dict) -> List[BudgetResult]:
+    """
+    Call every endpoint in ENDPOINT_BUDGETS in-process and count the statements it runs.
+    ids fills the path parameters. A result fails if it is over budget or the response is not 2xx.
+    """
+    import httpx  # Only needed by this harness
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://weavr.test") as client:
+        for path, budget in ENDPOINT_BUDGETS.items():
+            with count_statements() as counter:
+                response = await client.get(path.format(**ids))
+            results.append(BudgetResult(path, response.status_code, counter.statements, budget))
+    return results
@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -98,7 +98,7 @@ class Goal(GoalBase):
 class ConnectionBase(BaseModel):
     user_id: int
     connected_user_id: int
-    connection_strength: Optional[int] = 1
+    connection_strength: Optional[int] = 1  # Ignored on writes: computed from passions, goals and groups
 
 
 class ConnectionCreate(ConnectionBase):
@@ -133,6 +133,11 @@ class Introduction(IntroductionBase):
         from_attribute = True
 
 
+class IntroductionOpportunity(BaseModel):
+    introduced_user_id: int
+    target_user_id: int
+
+
 # --- Group Schemas ---
 class GroupBase(BaseModel):
     name: str
@@ -165,7 +170,7 @@ class GroupMembershipCreate(GroupMembershipBase):
 
 
 class GroupMembership(GroupMembershipBase):
-    joined_at: datetime
+    joined_at: Optional[datetime] = None  # Not recorded by the group_memberships table
 
     class Config:
         from_attribute = True
@@ -294,6 +299,27 @@ class Notification(NotificationBase):
         from_attribute = True
 
 
+class NotificationFanOut(BaseModel):
+    message: str
+    group_id: Optional[int] = None
+    user_ids: Optional[List[int]] = None
+    connections_of_user_id: Optional[int] = None  # Everyone connected to this user
+
+
+class NotificationFanOutSummary(BaseModel):
+    delivered: int
+
+
+class UnreadNotificationCount(BaseModel):
+    user_id: int
+    unread_count: int
+
+
+class NotificationsMarkedRead(BaseModel):
+    user_id: int
+    marked_read: int
+
+
 # --- Message Schemas ---
 class MessageBase(BaseModel):
     sender_id: int
@@ -329,6 +355,8 @@ class Post(PostBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    like_count: int = 0
+    comment_count: int = 0
 
     class Config:
         from_attribute = True
@@ -339,6 +367,7 @@ class CommentBase(BaseModel):
     post_id: int
     author_id: int  # Use author_id for consistency
     content: str
+    parent_id: Optional[int] = None  # Top-level comment this replies to
 
 
 class CommentCreate(CommentBase):
@@ -348,11 +377,19 @@ class CommentCreate(CommentBase):
 class Comment(CommentBase):
     id: int
     created_at: datetime
+    like_count: int = 0
+    reply_count: int = 0
 
     class Config:
         from_attribute = True
 
 
+class CommentThread(BaseModel):
+    comment: Comment
+    replies: List[Comment]  # Newest first
+    replies_next_cursor: Optional[str] = None  # Cursor for /comments/{id}/replies when more replies exist
+
+
 # --- Like Schemas ---
 class LikeBase(BaseModel):
     post_id: int
@@ -371,6 +408,20 @@ class Like(LikeBase):
         from_attribute = True
 
 
+class LikeToggle(BaseModel):
+    user_id: int
+    post_id: Optional[int] = None  # Exactly one of post_id and comment_id
+    comment_id: Optional[int] = None
+
+
+class LikeState(BaseModel):
+    user_id: int
+    post_id: Optional[int] = None
+    comment_id: Optional[int] = None
+    liked: bool
+    like_count: int
+
+
 # --- UserSettings Schemas ---
 class UserSettingsBase(BaseModel):
     theme: Optional[str] = 'light'
@@ -456,6 +507,21 @@ class NetworkProximity(BaseModel):
         from_attribute = True
 
 
+class NetworkProximityBatchRequest(BaseModel):
+    candidate_ids: List[int]
+
+
+class NetworkProximityBatch(BaseModel):
+    user_id: int
+    proximities: Dict[int, int]  # candidate id -> degree of separation (999 if not connected)
+
+
+class MutualConnectionCount(BaseModel):
+    user_id: int
+    other_user_id: int
+    count: int
+
+
 class UserRank(BaseModel):
     user_id: int
     rank: int
@@ -488,11 +554,11 @@ class ConnectionStatus(BaseModel):
 class GroupWithMembers(BaseModel):
     id: int
     name: str
-    description: str
+    description: Optional[str] = None
     privacy: GroupPrivacy
     rules: Optional[str] = None
-    created_at: datetime
-    members: int
+    created_at: Optional[datetime] = None  # Not recorded by the groups table
+    members: List[GroupMembership]
 
     class Config:
         from_attribute = True
@@ -505,4 +571,60 @@ class ConnectionStrength(BaseModel):
     created_at: datetime
 
     class Config:
-        from_attribute = True
\ No newline at end of file
+        from_attribute = True
+
+
+class ConnectionStrengthBatchRequest(BaseModel):
+    user_id: int
+    candidate_ids: List[int]
+
+
+class ConnectionStrengthBatch(BaseModel):
+    user_id: int
+    strengths: Dict[int, int]  # candidate id -> connection strength
+
+
+class StrengthCacheStats(BaseModel):
+    size: int
+    max_size: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    expirations: int
+    invalidations: int
+
+
+# --- Bulk Write Schemas ---
+class UserPassionCreate(BaseModel):
+    user_id: int
+    passion_id: int
+
+
+class EventAttendeeCreate(BaseModel):
+    event_id: int
+    user_id: int
+    rsvp_status: Optional[RSVPStatus] = RSVPStatus.interested
+
+
+class ConnectionBulkCreate(BaseModel):
+    connections: List[ConnectionCreate]
+
+
+class UserPassionBulkCreate(BaseModel):
+    user_passions: List[UserPassionCreate]
+
+
+class GroupMembershipBulkCreate(BaseModel):
+    group_memberships: List[GroupMembershipCreate]
+
+
+class EventAttendeeBulkCreate(BaseModel):
+    event_attendees: List[EventAttendeeCreate]
+
+
+class BulkWriteSummary(BaseModel):
+    requested: int
+    inserted: int
+    skipped: int  # Duplicates within the batch or rows that already existed
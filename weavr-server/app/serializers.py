@@ -0,0 +1,97 @@
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Type
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from app import schemas
+from app.models import Message, Notification, Post
+
+try:
+    import orjson
+except ImportError:  # Optional: the standard library encoder is used instead
+    orjson = None
+
+
+# --- Encoding ---
+def _encode_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode content as compact JSON, with orjson when it is installed.
+    Datetimes are written in ISO 8601 like Pydantic writes them.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_encode_default)
+    return json.dumps(content, default=_encode_default, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# --- Row Serializers ---
+class RowSerializer:
+    """
+    Maps Core result rows straight to the JSON shape of a response schema, without building ORM
+    objects or validating each row. The field-to-column mapping is checked against the schema once,
+    when the serializer is defined; fields without a column get the schema's default.
+    """
+
+    def __init__(self, schema: Type[BaseModel], columns: Dict[str, Any]):
+        fields = schema.model_fields
+        unknown = set(columns) - set(fields)
+        if unknown:
+            raise ValueError(f"{schema.__name__} has no fields {sorted(unknown)}")
+        missing = [name for name, field in fields.items() if name not in columns and field.is_required()]
+        if missing:
+            raise ValueError(f"{schema.__name__} fields {missing} need a column")
+
+        self.schema = schema
+        self.columns = list(columns.values())
+        self._names = tuple(columns)
+        self._defaults = {name: field.default for name, field in fields.items() if name not in columns}
+
+    def serialize(self, rows: Iterable[tuple]) -> List[dict]:
+        names, defaults = self._names, self._defaults
+        if defaults:
+            return [{**dict(zip(names, row)), **defaults} for row in rows]
+        return [dict(zip(names, row)) for row in rows]
+
+
+POST_SERIALIZER = RowSerializer(schemas.Post, {
+    "id": Post.id,
+    "author_id": Post.author_id,
+    "content": Post.content,
+    "created_at": Post.created_at,
+    "updated_at": Post.updated_at,
+    "like_count": Post.like_count,
+    "comment_count": Post.comment_count,
+})
+
+NOTIFICATION_SERIALIZER = RowSerializer(schemas.Notification, {
+    "id": Notification.id,
+    "user_id": Notification.user_id,
+    "message": Notification.message,
+    "is_read": Notification.is_read,
+    "created_at": Notification.created_at,
+})
+
+MESSAGE_SERIALIZER = RowSerializer(schemas.Message, {
+    "id": Message.id,
+    "sender_id": Message.sender_id,
+    "receiver_id": Message.receiver_id,
+    "content": Message.content,
+    "created_at": Message.sent_at,
+})
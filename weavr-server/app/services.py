@@ -1,12 +1,19 @@
+from collections import defaultdict
 from datetime import date, timedelta
-from typing import List, Type, Optional
+from typing import Dict, List, Sequence, Tuple, Type, Optional
 
-from sqlalchemy.orm import Session, relationship
+from sqlalchemy import Integer, func, literal, select, union, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
+from app.cache import strength_cache
+from app.config import settings
 from app.crud import (
     create_user, get_user, update_user, delete_user,
     create_goal, get_goal, update_goal, delete_goal, get_goals_by_user,
     create_connection, get_connection, get_connections_for_user, update_connection, delete_connection,
+    get_degree_of_separation, get_degrees_of_separation, get_mutual_connection_count,
+    get_strong_contact_ids, get_connected_pairs,
     create_introduction, get_introduction, update_introduction, delete_introduction, get_introductions_by_user,
     create_group, get_group, update_group, delete_group,
     create_group_membership, get_group_membership, update_group_membership, delete_group_membership,
@@ -18,573 +25,848 @@ from app.crud import (
     create_event, get_event, update_event, delete_event,
     create_notification, get_notification, get_notifications_for_user, update_notification, delete_notification,
     create_message, get_conversation, update_message, delete_message,
-    create_post, get_post, update_post, delete_post, get_all_posts,
-    create_comment, get_comment, update_comment, delete_comment, get_comments_for_post,
-    create_like, get_like, delete_like,
+    create_post, get_post, update_post, delete_post, get_all_posts, get_home_timeline,
+    create_comment, get_comment, update_comment, delete_comment, get_comments_for_post, get_replies,
+    get_comment_threads,
+    create_like, get_like, delete_like, toggle_like,
     create_user_settings, get_user_settings, update_user_settings,
     create_feedback, get_feedback, get_all_feedback,
     create_report, get_report, get_all_reports,
-    create_notification_settings, get_notification_settings, update_notification_settings, get_messages_for_user
+    create_notification_settings, get_notification_settings, update_notification_settings, get_messages_for_user,
+    bulk_create_connections, bulk_create_user_passions, bulk_create_group_memberships, bulk_create_event_attendees,
+    fan_out_notification, get_unread_notification_count, mark_all_notifications_read
 )
+from app.graph_snapshot import current_snapshot
 from app.models import (
     User, Goal, Connection, Introduction, Group, GroupMembership, Badge, Leaderboard,
     LeaderboardEntry, WeavrWisdom, Event, Notification, Message, Post, Comment,
     Like, UserSettings, Feedback, Report, NotificationSettings, user_badges, user_passions, Passion, UserActivity,
-    UserPoints
+    UserPoints, MutualConnection
 )
+from app.network import adjacency_index
+from app.pagination import Page
 from app.schemas import GoalType, IntroductionStatus, WeavrWisdomCategory
 from app.schemas import (
     UserCreate, UserUpdate, GoalCreate, ConnectionCreate, IntroductionCreate, GroupCreate,
     GroupMembershipCreate, BadgeCreate, LeaderboardCreate, LeaderboardEntryCreate,
     WeavrWisdomCreate, EventCreate, NotificationCreate, MessageCreate, PostCreate,
     CommentCreate, LikeCreate, UserSettingsCreate, FeedbackCreate, ReportCreate,
-    NotificationSettingsCreate
+    NotificationSettingsCreate, UserPassionCreate, EventAttendeeCreate
 )
 
 
 # --- User Services ---
-def create_user_service(db: Session, user_create: UserCreate) -> User:
-    return create_user(db, user_create)
+async def create_user_service(db: AsyncSession, user_create: UserCreate) -> User:
+    return await create_user(db, user_create)
 
 
-def get_user_service(db: Session, user_id: int) -> User:
-    return get_user(db, user_id)
+async def get_user_service(db: AsyncSession, user_id: int) -> User:
+    return await get_user(db, user_id)
 
 
-def update_user_service(db: Session, user_id: int, user_update: UserUpdate) -> User:
-    return update_user(db, user_id, user_update)
+async def update_user_service(db: AsyncSession, user_id: int, user_update: UserUpdate) -> User:
+    return await update_user(db, user_id, user_update)
 
 
-def delete_user_service(db: Session, user_id: int) -> User:
-    return delete_user(db, user_id)
+async def delete_user_service(db: AsyncSession, user_id: int) -> User:
+    return await delete_user(db, user_id)
+
+
+async def bulk_create_user_passions_service(db: AsyncSession, user_passion_links: List[UserPassionCreate]) -> int:
+    return await bulk_create_user_passions(db, user_passion_links)
 
 
 # --- Goal Services ---
-def create_goal_service(db: Session, goal_create: GoalCreate, user_id: int) -> Goal:
-    return create_goal(db, goal_create, user_id)
+async def create_goal_service(db: AsyncSession, goal_create: GoalCreate, user_id: int) -> Goal:
+    return await create_goal(db, goal_create, user_id)
 
 
-def get_goal_service(db: Session, goal_id: int) -> Goal:
-    return get_goal(db, goal_id)
+async def get_goal_service(db: AsyncSession, goal_id: int) -> Goal:
+    return await get_goal(db, goal_id)
 
 
-def get_goals_by_user_service(db: Session, user_id: int) -> List[Goal]:
-    return get_goals_by_user(db, user_id)
+async def get_goals_by_user_service(db: AsyncSession, user_id: int) -> List[Goal]:
+    return await get_goals_by_user(db, user_id)
 
 
-def update_goal_service(db: Session, goal_id: int, goal_update: GoalCreate) -> Goal:
-    return update_goal(db, goal_id, goal_update)
+async def update_goal_service(db: AsyncSession, goal_id: int, goal_update: GoalCreate) -> Goal:
+    return await update_goal(db, goal_id, goal_update)
 
 
-def delete_goal_service(db: Session, goal_id: int) -> Goal:
-    return delete_goal(db, goal_id)
+async def delete_goal_service(db: AsyncSession, goal_id: int) -> Goal:
+    return await delete_goal(db, goal_id)
 
 
 # --- Connection Services ---
-def create_connection_service(db: Session, connection_create: ConnectionCreate) -> Connection:
-    return create_connection(db, connection_create)
+async def create_connection_service(db: AsyncSession, connection_create: ConnectionCreate) -> Connection:
+    return await create_connection(db, connection_create)
+
+
+async def get_connection_service(db: AsyncSession, user_id: int, connected_user_id: int) -> Connection:
+    return await get_connection(db, user_id, connected_user_id)
+
 
+async def get_connections_for_user_service(db: AsyncSession, user_id: int) -> List[Connection]:
+    return await get_connections_for_user(db, user_id)
 
-def get_connection_service(db: Session, user_id: int, connected_user_id: int) -> Connection:
-    return get_connection(db, user_id, connected_user_id)
 
+async def get_mutual_connection_count_service(db: AsyncSession, user_id: int, other_user_id: int) -> int:
+    return await get_mutual_connection_count(db, user_id, other_user_id)
 
-def get_connections_for_user_service(db: Session, user_id: int) -> List[Connection]:
-    return get_connections_for_user(db, user_id)
 
+async def update_connection_service(db: AsyncSession, user_id: int, connected_user_id: int,
+                                    connection_update: ConnectionCreate) -> Connection:
+    return await update_connection(db, user_id, connected_user_id, connection_update)
 
-def update_connection_service(db: Session, user_id: int, connected_user_id: int,
-                              connection_update: ConnectionCreate) -> Connection:
-    return update_connection(db, user_id, connected_user_id, connection_update)
 
+async def delete_connection_service(db: AsyncSession, user_id: int, connected_user_id: int) -> Connection:
+    return await delete_connection(db, user_id, connected_user_id)
 
-def delete_connection_service(db: Session, user_id: int, connected_user_id: int) -> Connection:
-    return delete_connection(db, user_id, connected_user_id)
+
+async def bulk_create_connections_service(db: AsyncSession, connections: List[ConnectionCreate]) -> int:
+    return await bulk_create_connections(db, connections)
 
 
 # --- Introduction Services ---
-def create_introduction_service(db: Session, introduction_create: IntroductionCreate) -> Introduction:
-    return create_introduction(db, introduction_create)
+async def can_introduce(db: AsyncSession, introducer_id: int, introduced_user_id: int, target_user_id: int) -> bool:
+    """
+    Check whether the introducer is connected to both parties with at least INTRODUCTION_MIN_STRENGTH,
+    using the stored connection strengths in a single lookup.
+    """
+    if introduced_user_id == target_user_id:
+        return False
+    parties = [introduced_user_id, target_user_id]
+    strong_contacts = await get_strong_contact_ids(db, introducer_id, settings.INTRODUCTION_MIN_STRENGTH, among=parties)
+    return len(strong_contacts) == 2
+
+
+async def create_introduction_service(db: AsyncSession, introduction_create: IntroductionCreate) -> Introduction:
+    if not await can_introduce(db, introduction_create.introducer_id, introduction_create.introduced_user_id,
+                         introduction_create.target_user_id):
+        raise ValueError(f"User with ID {introduction_create.introducer_id} is not strongly connected to both users.")
+    return await create_introduction(db, introduction_create)
 
 
-def get_introduction_service(db: Session, introduction_id: int) -> Introduction:
-    return get_introduction(db, introduction_id)
+async def get_introduction_opportunities_service(db: AsyncSession, user_id: int,
+                                                 limit: int = 100) -> List[tuple[int, int]]:
+    """
+    List pairs of the user's strong contacts who are not yet connected to each other,
+    i.e. every introduction the user is eligible to make.
+    """
+    contact_ids = sorted(await get_strong_contact_ids(db, user_id, settings.INTRODUCTION_MIN_STRENGTH))
+    connected_pairs = await get_connected_pairs(db, contact_ids)
+
+    opportunities = []
+    for index, introduced_user_id in enumerate(contact_ids):
+        for target_user_id in contact_ids[index + 1:]:
+            if (introduced_user_id, target_user_id) not in connected_pairs:
+                opportunities.append((introduced_user_id, target_user_id))
+                if len(opportunities) >= limit:
+                    return opportunities
+    return opportunities
+
+
+async def get_introduction_service(db: AsyncSession, introduction_id: int) -> Introduction:
+    return await get_introduction(db, introduction_id)
 
 
-def get_introductions_by_user_service(db: Session, user_id: int) -> List[Introduction]:
-    return get_introductions_by_user(db, user_id)
+async def get_introductions_by_user_service(db: AsyncSession, user_id: int) -> List[Introduction]:
+    return await get_introductions_by_user(db, user_id)
 
 
-def update_introduction_service(db: Session, introduction_id: int,
-                                introduction_update: IntroductionCreate) -> Introduction:
-    return update_introduction(db, introduction_id, introduction_update)
+async def update_introduction_service(db: AsyncSession, introduction_id: int,
+                                      introduction_update: IntroductionCreate) -> Introduction:
+    return await update_introduction(db, introduction_id, introduction_update)
 
 
-def delete_introduction_service(db: Session, introduction_id: int) -> Introduction:
-    return delete_introduction(db, introduction_id)
+async def delete_introduction_service(db: AsyncSession, introduction_id: int) -> Introduction:
+    return await delete_introduction(db, introduction_id)
 
 
 # --- Group Services ---
-def create_group_service(db: Session, group_create: GroupCreate) -> Group:
-    return create_group(db, group_create)
+async def create_group_service(db: AsyncSession, group_create: GroupCreate) -> Group:
+    return await create_group(db, group_create)
 
 
-def get_group_service(db: Session, group_id: int) -> Group:
-    return get_group(db, group_id)
+async def get_group_service(db: AsyncSession, group_id: int) -> Group:
+    return await get_group(db, group_id)
 
 
-def update_group_service(db: Session, group_id: int, group_update: GroupCreate) -> Group:
-    return update_group(db, group_id, group_update)
+async def update_group_service(db: AsyncSession, group_id: int, group_update: GroupCreate) -> Group:
+    return await update_group(db, group_id, group_update)
 
 
-def delete_group_service(db: Session, group_id: int) -> Group:
-    return delete_group(db, group_id)
+async def delete_group_service(db: AsyncSession, group_id: int) -> Group:
+    return await delete_group(db, group_id)
 
 
 # --- GroupMembership Services ---
-def create_group_membership_service(db: Session, group_membership_create: GroupMembershipCreate) -> GroupMembership:
-    return create_group_membership(db, group_membership_create)
+async def create_group_membership_service(db: AsyncSession,
+                                          group_membership_create: GroupMembershipCreate) -> GroupMembership:
+    return await create_group_membership(db, group_membership_create)
 
 
-def get_group_membership_service(db: Session, user_id: int, group_id: int) -> GroupMembership:
-    return get_group_membership(db, user_id, group_id)
+async def get_group_membership_service(db: AsyncSession, user_id: int, group_id: int) -> GroupMembership:
+    return await get_group_membership(db, user_id, group_id)
 
 
-def get_group_memberships_by_user_service(db: Session, user_id: int) -> List[GroupMembership]:
-    return get_group_memberships_by_user(db, user_id)
+async def get_group_memberships_by_user_service(db: AsyncSession, user_id: int) -> List[GroupMembership]:
+    return await get_group_memberships_by_user(db, user_id)
 
 
-def update_group_membership_service(db: Session, user_id: int, group_id: int,
-                                    group_membership_update: GroupMembershipCreate) -> GroupMembership:
-    return update_group_membership(db, user_id, group_id, group_membership_update)
+async def update_group_membership_service(db: AsyncSession, user_id: int, group_id: int,
+                                          group_membership_update: GroupMembershipCreate) -> GroupMembership:
+    return await update_group_membership(db, user_id, group_id, group_membership_update)
 
 
-def delete_group_membership_service(db: Session, user_id: int, group_id: int) -> GroupMembership:
-    return delete_group_membership(db, user_id, group_id)
+async def delete_group_membership_service(db: AsyncSession, user_id: int, group_id: int) -> GroupMembership:
+    return await delete_group_membership(db, user_id, group_id)
+
+
+async def bulk_create_group_memberships_service(db: AsyncSession,
+                                                group_memberships: List[GroupMembershipCreate]) -> int:
+    return await bulk_create_group_memberships(db, group_memberships)
 
 
 # --- Badge Services ---
-def create_badge_service(db: Session, badge_create: BadgeCreate) -> Badge:
-    return create_badge(db, badge_create)
+async def create_badge_service(db: AsyncSession, badge_create: BadgeCreate) -> Badge:
+    return await create_badge(db, badge_create)
 
 
-def get_badge_service(db: Session, badge_id: int) -> Badge:
-    return get_badge(db, badge_id)
+async def get_badge_service(db: AsyncSession, badge_id: int) -> Badge:
+    return await get_badge(db, badge_id)
 
 
-def update_badge_service(db: Session, badge_id: int, badge_update: BadgeCreate) -> Badge:
-    return update_badge(db, badge_id, badge_update)
+async def update_badge_service(db: AsyncSession, badge_id: int, badge_update: BadgeCreate) -> Badge:
+    return await update_badge(db, badge_id, badge_update)
 
 
-def delete_badge_service(db: Session, badge_id: int) -> Badge:
-    return delete_badge(db, badge_id)
+async def delete_badge_service(db: AsyncSession, badge_id: int) -> Badge:
+    return await delete_badge(db, badge_id)
 
 
 # --- Leaderboard Services ---
-def create_leaderboard_service(db: Session, leaderboard_create: LeaderboardCreate) -> Leaderboard:
-    return create_leaderboard(db, leaderboard_create)
+async def create_leaderboard_service(db: AsyncSession, leaderboard_create: LeaderboardCreate) -> Leaderboard:
+    return await create_leaderboard(db, leaderboard_create)
 
 
-def get_leaderboard_service(db: Session, leaderboard_id: int) -> Leaderboard:
-    return get_leaderboard(db, leaderboard_id)
+async def get_leaderboard_service(db: AsyncSession, leaderboard_id: int) -> Leaderboard:
+    return await get_leaderboard(db, leaderboard_id)
 
 
-def delete_leaderboard_service(db: Session, leaderboard_id: int) -> Leaderboard:
-    return delete_leaderboard(db, leaderboard_id)
+async def delete_leaderboard_service(db: AsyncSession, leaderboard_id: int) -> Leaderboard:
+    return await delete_leaderboard(db, leaderboard_id)
 
 
 # --- LeaderboardEntry Services ---
-def create_leaderboard_entry_service(db: Session, leaderboard_entry_create: LeaderboardEntryCreate) -> LeaderboardEntry:
-    return create_leaderboard_entry(db, leaderboard_entry_create)
+async def create_leaderboard_entry_service(db: AsyncSession,
+                                           leaderboard_entry_create: LeaderboardEntryCreate) -> LeaderboardEntry:
+    return await create_leaderboard_entry(db, leaderboard_entry_create)
 
 
-def get_leaderboard_entry_service(db: Session, leaderboard_entry_id: int) -> LeaderboardEntry:
-    return get_leaderboard_entry(db, leaderboard_entry_id)
+async def get_leaderboard_entry_service(db: AsyncSession, leaderboard_entry_id: int) -> LeaderboardEntry:
+    return await get_leaderboard_entry(db, leaderboard_entry_id)
 
 
-def get_leaderboard_entries_by_leaderboard_service(db: Session, leaderboard_id: int) -> List[LeaderboardEntry]:
-    return get_leaderboard_entries_by_leaderboard(db, leaderboard_id)
+async def get_leaderboard_entries_by_leaderboard_service(db: AsyncSession,
+                                                         leaderboard_id: int) -> List[LeaderboardEntry]:
+    return await get_leaderboard_entries_by_leaderboard(db, leaderboard_id)
 
 
 # --- WeavrWisdom Services ---
-def create_weavr_wisdom_service(db: Session, weavr_wisdom_create: WeavrWisdomCreate) -> WeavrWisdom:
-    return create_weavr_wisdom(db, weavr_wisdom_create)
+async def create_weavr_wisdom_service(db: AsyncSession, weavr_wisdom_create: WeavrWisdomCreate) -> WeavrWisdom:
+    return await create_weavr_wisdom(db, weavr_wisdom_create)
 
 
-def get_weavr_wisdom_service(db: Session, wisdom_id: int) -> WeavrWisdom:
-    return get_weavr_wisdom(db, wisdom_id)
+async def get_weavr_wisdom_service(db: AsyncSession, wisdom_id: int) -> WeavrWisdom:
+    return await get_weavr_wisdom(db, wisdom_id)
 
 
-def update_weavr_wisdom_service(db: Session, wisdom_id: int, weavr_wisdom_update: WeavrWisdomCreate) -> WeavrWisdom:
-    return update_weavr_wisdom(db, wisdom_id, weavr_wisdom_update)
+async def update_weavr_wisdom_service(db: AsyncSession, wisdom_id: int,
+                                      weavr_wisdom_update: WeavrWisdomCreate) -> WeavrWisdom:
+    return await update_weavr_wisdom(db, wisdom_id, weavr_wisdom_update)
 
 
-def delete_weavr_wisdom_service(db: Session, wisdom_id: int) -> WeavrWisdom:
-    return delete_weavr_wisdom(db, wisdom_id)
+async def delete_weavr_wisdom_service(db: AsyncSession, wisdom_id: int) -> WeavrWisdom:
+    return await delete_weavr_wisdom(db, wisdom_id)
 
 
 # --- Event Services ---
-def create_event_service(db: Session, event_create: EventCreate) -> Event:
-    return create_event(db, event_create)
+async def create_event_service(db: AsyncSession, event_create: EventCreate) -> Event:
+    return await create_event(db, event_create)
+
 
+async def get_event_service(db: AsyncSession, event_id: int) -> Event:
+    return await get_event(db, event_id)
 
-def get_event_service(db: Session, event_id: int) -> Event:
-    return get_event(db, event_id)
 
+async def update_event_service(db: AsyncSession, event_id: int, event_update: EventCreate) -> Event:
+    return await update_event(db, event_id, event_update)
 
-def update_event_service(db: Session, event_id: int, event_update: EventCreate) -> Event:
-    return update_event(db, event_id, event_update)
 
+async def delete_event_service(db: AsyncSession, event_id: int) -> Event:
+    return await delete_event(db, event_id)
 
-def delete_event_service(db: Session, event_id: int) -> Event:
-    return delete_event(db, event_id)
+
+async def bulk_create_event_attendees_service(db: AsyncSession, event_attendee_links: List[EventAttendeeCreate]) -> int:
+    return await bulk_create_event_attendees(db, event_attendee_links)
 
 
 # --- Notification Services ---
-def create_notification_service(db: Session, notification_create: NotificationCreate) -> Notification:
-    return create_notification(db, notification_create)
+async def create_notification_service(db: AsyncSession, notification_create: NotificationCreate) -> Notification:
+    return await create_notification(db, notification_create)
+
 
+async def fan_out_notification_service(db: AsyncSession, message: str, group_id: Optional[int] = None,
+                                      user_ids: Optional[List[int]] = None,
+                                      connections_of_user_id: Optional[int] = None) -> int:
+    """
+    Notify the members of a group, an explicit list of users and/or everyone connected to a user,
+    each recipient once, in a single statement.
+    """
+    audiences = []
+    if group_id is not None:
+        audiences.append(select(GroupMembership.user_id.label("user_id")).where(GroupMembership.group_id == group_id))
+    if user_ids:
+        audiences.append(select(User.id.label("user_id")).where(User.id.in_(user_ids)))
+    if connections_of_user_id is not None:
+        audiences.append(select(Connection.user_id.label("user_id"))
+                         .where(Connection.connected_user_id == connections_of_user_id))
+        audiences.append(select(Connection.connected_user_id.label("user_id"))
+                         .where(Connection.user_id == connections_of_user_id))
+    if not audiences:
+        raise ValueError("A group, user ids or a user whose connections to notify is required.")
+
+    return await fan_out_notification(db, union(*audiences).subquery(), message)
+
+
+async def get_notification_service(db: AsyncSession, notification_id: int) -> Notification:
+    return await get_notification(db, notification_id)
 
-def get_notification_service(db: Session, notification_id: int) -> Notification:
-    return get_notification(db, notification_id)
 
+async def get_notifications_for_user_service(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100,
+                                             cursor: Optional[str] = None, columns: Optional[Sequence] = None) -> Page:
+    return await get_notifications_for_user(db, user_id, skip, limit, cursor, columns)
 
-def get_notifications_for_user_service(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[
-    Notification]:
-    return get_notifications_for_user(db, user_id, skip, limit)
 
+async def get_unread_notification_count_service(db: AsyncSession, user_id: int) -> int:
+    return await get_unread_notification_count(db, user_id)
 
-def update_notification_service(db: Session, notification_id: int,
-                                notification_update: NotificationCreate) -> Notification:
-    return update_notification(db, notification_id, notification_update)
 
+async def mark_all_notifications_read_service(db: AsyncSession, user_id: int) -> int:
+    return await mark_all_notifications_read(db, user_id)
 
-def delete_notification_service(db: Session, notification_id: int) -> Notification:
-    return delete_notification(db, notification_id)
+
+async def update_notification_service(db: AsyncSession, notification_id: int,
+                                      notification_update: NotificationCreate) -> Notification:
+    return await update_notification(db, notification_id, notification_update)
+
+
+async def delete_notification_service(db: AsyncSession, notification_id: int) -> Notification:
+    return await delete_notification(db, notification_id)
 
 
 # --- Message Services ---
-def create_message_service(db: Session, message_create: MessageCreate) -> Message:
-    return create_message(db, message_create)
+async def create_message_service(db: AsyncSession, message_create: MessageCreate) -> Message:
+    return await create_message(db, message_create)
 
 
-def get_message_service(db: Session, message_id: int) -> list[Message]:
-    return get_messages_for_user(db, message_id)
+async def get_message_service(db: AsyncSession, message_id: int) -> list[Message]:
+    return await get_messages_for_user(db, message_id)
 
 
-def get_conversation_service(db: Session, user1_id: int, user2_id: int, skip: int = 0,
-                             limit: int = 100) -> List[Message]:
-    return get_conversation(db, user1_id, user2_id, skip, limit)
+async def get_conversation_service(db: AsyncSession, user1_id: int, user2_id: int, skip: int = 0,
+                                   limit: int = 100, cursor: Optional[str] = None,
+                                   columns: Optional[Sequence] = None) -> Page:
+    return await get_conversation(db, user1_id, user2_id, skip, limit, cursor, columns)
 
 
-def update_message_service(db: Session, message_id: int, message_update: MessageCreate) -> list[Message]:
-    return update_message(db, message_id, message_update)
+async def update_message_service(db: AsyncSession, message_id: int, message_update: MessageCreate) -> list[Message]:
+    return await update_message(db, message_id, message_update)
 
 
-def delete_message_service(db: Session, message_id: int) -> list[Message]:
-    return delete_message(db, message_id)
+async def delete_message_service(db: AsyncSession, message_id: int) -> list[Message]:
+    return await delete_message(db, message_id)
 
 
 # --- Post Services ---
-def create_post_service(db: Session, post_create: PostCreate, author_id: int) -> Post:
-    return create_post(db, post_create, author_id)
+async def create_post_service(db: AsyncSession, post_create: PostCreate, author_id: int) -> Post:
+    return await create_post(db, post_create, author_id)
+
+
+async def get_post_service(db: AsyncSession, post_id: int) -> Post:
+    return await get_post(db, post_id)
 
 
-def get_post_service(db: Session, post_id: int) -> Post:
-    return get_post(db, post_id)
+async def get_all_posts_service(db: AsyncSession, skip: int = 0, limit: int = 100,
+                                cursor: Optional[str] = None, columns: Optional[Sequence] = None) -> Page:
+    return await get_all_posts(db, skip, limit, cursor, columns)
 
 
-def get_all_posts_service(db: Session, skip: int = 0, limit: int = 100) -> list[Type[Post]]:
-    return get_all_posts(db, skip, limit)
+async def get_home_timeline_service(db: AsyncSession, user_id: int, limit: int = 100, cursor: Optional[str] = None,
+                                    columns: Optional[Sequence] = None) -> Page:
+    return await get_home_timeline(db, user_id, limit, cursor, columns)
 
 
-def update_post_service(db: Session, post_id: int, post_update: PostCreate) -> Post:
-    return update_post(db, post_id, post_update)
+async def update_post_service(db: AsyncSession, post_id: int, post_update: PostCreate) -> Post:
+    return await update_post(db, post_id, post_update)
 
 
-def delete_post_service(db: Session, post_id: int) -> Post:
-    return delete_post(db, post_id)
+async def delete_post_service(db: AsyncSession, post_id: int) -> Post:
+    return await delete_post(db, post_id)
 
 
 # --- Comment Services ---
-def create_comment_service(db: Session, comment_create: CommentCreate, author_id: int, post_id: int) -> Comment:
-    return create_comment(db, comment_create, author_id, post_id)
+async def create_comment_service(db: AsyncSession, comment_create: CommentCreate, author_id: int,
+                                 post_id: int) -> Comment:
+    return await create_comment(db, comment_create, author_id, post_id)
 
 
-def get_comment_service(db: Session, comment_id: int) -> Comment:
-    return get_comment(db, comment_id)
+async def get_comment_service(db: AsyncSession, comment_id: int) -> Comment:
+    return await get_comment(db, comment_id)
 
 
-def get_comments_for_post_service(db: Session, post_id: int, skip: int = 0, limit: int = 100) -> List[Comment]:
-    return get_comments_for_post(db, post_id, skip, limit)
+async def get_comments_for_post_service(db: AsyncSession, post_id: int, skip: int = 0,
+                                        limit: int = 100, cursor: Optional[str] = None) -> Page:
+    return await get_comments_for_post(db, post_id, skip, limit, cursor)
 
 
-def update_comment_service(db: Session, comment_id: int, comment_update: CommentCreate) -> Comment:
-    return update_comment(db, comment_id, comment_update)
+async def get_comment_threads_service(db: AsyncSession, post_id: int, skip: int = 0, limit: int = 100,
+                                      cursor: Optional[str] = None, replies: int = 3) -> Page:
+    return await get_comment_threads(db, post_id, skip, limit, cursor, replies)
 
 
-def delete_comment_service(db: Session, comment_id: int) -> Comment:
-    return delete_comment(db, comment_id)
+async def get_replies_service(db: AsyncSession, comment_id: int, skip: int = 0, limit: int = 100,
+                              cursor: Optional[str] = None) -> Page:
+    return await get_replies(db, comment_id, skip, limit, cursor)
+
+
+async def update_comment_service(db: AsyncSession, comment_id: int, comment_update: CommentCreate) -> Comment:
+    return await update_comment(db, comment_id, comment_update)
+
+
+async def delete_comment_service(db: AsyncSession, comment_id: int) -> Comment:
+    return await delete_comment(db, comment_id)
 
 
 # --- Like Services ---
-def create_like_service(db: Session, like_create: LikeCreate) -> Like:
-    return create_like(db, like_create)
+async def create_like_service(db: AsyncSession, like_create: LikeCreate) -> Like:
+    return await create_like(db, like_create)
+
 
+async def get_like_service(db: AsyncSession, user_id: int, post_id: int = None, comment_id: int = None) -> Like:
+    return await get_like(db, user_id, post_id, comment_id)
 
-def get_like_service(db: Session, user_id: int, post_id: int = None, comment_id: int = None) -> Like:
-    return get_like(db, user_id, post_id, comment_id)
 
+async def delete_like_service(db: AsyncSession, like_id: int) -> Like:
+    return await delete_like(db, like_id)
 
-def delete_like_service(db: Session, like_id: int) -> Like:
-    return delete_like(db, like_id)
+
+async def toggle_like_service(db: AsyncSession, user_id: int, post_id: Optional[int] = None,
+                              comment_id: Optional[int] = None) -> Optional[Tuple[bool, int]]:
+    return await toggle_like(db, user_id, post_id, comment_id)
 
 
 # --- User Settings Services ---
-def create_user_settings_service(db: Session, user_settings_create: UserSettingsCreate, user_id: int) -> UserSettings:
-    return create_user_settings(db, user_settings_create, user_id)
+async def create_user_settings_service(db: AsyncSession, user_settings_create: UserSettingsCreate,
+                                       user_id: int) -> UserSettings:
+    return await create_user_settings(db, user_settings_create, user_id)
 
 
-def get_user_settings_service(db: Session, user_id: int) -> UserSettings:
-    return get_user_settings(db, user_id)
+async def get_user_settings_service(db: AsyncSession, user_id: int) -> UserSettings:
+    return await get_user_settings(db, user_id)
 
 
-def update_user_settings_service(db: Session, user_id: int, user_settings_update: UserSettingsCreate) -> UserSettings:
-    return update_user_settings(db, user_id, user_settings_update)
+async def update_user_settings_service(db: AsyncSession, user_id: int,
+                                       user_settings_update: UserSettingsCreate) -> UserSettings:
+    return await update_user_settings(db, user_id, user_settings_update)
 
 
 # --- Feedback Services ---
-def create_feedback_service(db: Session, feedback_create: FeedbackCreate, user_id: int) -> Feedback:
-    return create_feedback(db, feedback_create, user_id)
+async def create_feedback_service(db: AsyncSession, feedback_create: FeedbackCreate, user_id: int) -> Feedback:
+    return await create_feedback(db, feedback_create, user_id)
 
 
-def get_feedback_service(db: Session, feedback_id: int) -> Feedback:
-    return get_feedback(db, feedback_id)
+async def get_feedback_service(db: AsyncSession, feedback_id: int) -> Feedback:
+    return await get_feedback(db, feedback_id)
 
 
-def get_all_feedback_service(db: Session, skip: int = 0, limit: int = 100) -> list[Type[Feedback]]:
-    return get_all_feedback(db, skip, limit)
+async def get_all_feedback_service(db: AsyncSession, skip: int = 0, limit: int = 100,
+                                   cursor: Optional[str] = None) -> Page:
+    return await get_all_feedback(db, skip, limit, cursor)
 
 
 # --- Report Services ---
-def create_report_service(db: Session, report_create: ReportCreate, user_id: int) -> Report:
-    return create_report(db, report_create, user_id)
+async def create_report_service(db: AsyncSession, report_create: ReportCreate, user_id: int) -> Report:
+    return await create_report(db, report_create, user_id)
 
 
-def get_report_service(db: Session, report_id: int) -> Report:
-    return get_report(db, report_id)
+async def get_report_service(db: AsyncSession, report_id: int) -> Report:
+    return await get_report(db, report_id)
 
 
-def get_all_reports_service(db: Session, skip: int = 0, limit: int = 100) -> list[Type[Report]]:
-    return get_all_reports(db, skip, limit)
+async def get_all_reports_service(db: AsyncSession, skip: int = 0, limit: int = 100,
+                                  cursor: Optional[str] = None) -> Page:
+    return await get_all_reports(db, skip, limit, cursor)
 
 
 # --- Notification Settings Services ---
-def create_notification_settings_service(db: Session, notification_settings_create: NotificationSettingsCreate,
-                                         user_id: int) -> NotificationSettings:
-    return create_notification_settings(db, notification_settings_create, user_id)
+async def create_notification_settings_service(db: AsyncSession, notification_settings_create: NotificationSettingsCreate,
+                                               user_id: int) -> NotificationSettings:
+    return await create_notification_settings(db, notification_settings_create, user_id)
 
 
-def get_notification_settings_service(db: Session, user_id: int) -> NotificationSettings:
-    return get_notification_settings(db, user_id)
+async def get_notification_settings_service(db: AsyncSession, user_id: int) -> NotificationSettings:
+    return await get_notification_settings(db, user_id)
 
 
-def update_notification_settings_service(db: Session, user_id: int,
-                                         notification_settings_update: NotificationSettingsCreate) -> NotificationSettings:
-    return update_notification_settings(db, user_id, notification_settings_update)
+async def update_notification_settings_service(db: AsyncSession, user_id: int,
+                                               notification_settings_update: NotificationSettingsCreate) -> NotificationSettings:
+    return await update_notification_settings(db, user_id, notification_settings_update)
 
 
 # --- New Function: Get User with Passions and Goals ---
-def get_user_with_passions_and_goals(db: Session, user_id: int) -> Optional[User]:
+async def get_user_with_passions_and_goals(db: AsyncSession, user_id: int) -> Optional[User]:
     """
     Get a user object along with their associated passions and goals.
     """
-    return db.query(User).options(
-        relationship("passions"), relationship("goals")
-    ).filter(User.id == user_id).first()
+    return await db.scalar(select(User).options(
+        selectinload(User.passions), selectinload(User.goals)
+    ).where(User.id == user_id))
 
 
 # --- New Function:  Get Users with a Specific Passion ---
-def get_users_by_passion(db: Session, passion_name: str) -> List[User]:
+async def get_users_by_passion(db: AsyncSession, passion_name: str) -> List[User]:
     """
     Get all users who have a specific passion.
     """
-    return db.query(User).join(user_passions).join(Passion).filter(Passion.name == passion_name).all()
+    return (await db.scalars(select(User).join(user_passions).join(Passion).where(Passion.name == passion_name))).all()
 
 
 # --- New Function: Check if Two Users are Connected ---
-def are_users_connected(db: Session, user_id1: int, user_id2: int) -> bool:
+async def are_users_connected(db: AsyncSession, user_id1: int, user_id2: int) -> bool:
     """
     Check if two users are directly connected.
     """
-    return get_connection(db, user_id1, user_id2) is not None
+    return await get_connection(db, user_id1, user_id2) is not None
 
 
 # --- New Function: Get Introductions by Status ---
-def get_introductions_by_status(db: Session, user_id: int, status: IntroductionStatus) -> List[Introduction]:
+async def get_introductions_by_status(db: AsyncSession, user_id: int, status: IntroductionStatus) -> List[Introduction]:
     """
     Get introductions for a user filtered by status (pending, accepted, rejected).
     """
-    return db.query(Introduction).filter(Introduction.target_user_id == user_id, Introduction.status == status).all()
+    return (await db.scalars(select(Introduction).where(Introduction.target_user_id == user_id,
+                                                        Introduction.status == status))).all()
 
 
 # --- New Function:  Get Group with Members ---
-def get_group_with_members(db: Session, group_id: int) -> Optional[Group]:
+async def get_group_with_members(db: AsyncSession, group_id: int) -> Optional[Group]:
     """
-    Get a group object along with its members.
+    Get a group object along with its members, in two statements.
     """
-    return db.query(Group).options(relationship("members")).filter(Group.id == group_id).first()
+    return await db.scalar(select(Group).options(selectinload(Group.members)).where(Group.id == group_id))
 
 
 # --- New Function:  Get Badges for a User ---
-def get_badges_for_user(db: Session, user_id: int) -> list[Type[Badge]]:
+async def get_badges_for_user(db: AsyncSession, user_id: int) -> list[Type[Badge]]:
     """
     Get all badges earned by a user.
     """
-    return db.query(Badge).join(user_badges).filter(user_badges.c.user_id == user_id).all()
+    return (await db.scalars(select(Badge).join(user_badges).where(user_badges.c.user_id == user_id))).all()
 
 
 # --- New Function: Search Weavr Wisdom ---
-def search_weavr_wisdom(db: Session, query: str, category: Optional[WeavrWisdomCategory] = None) -> list[
+async def search_weavr_wisdom(db: AsyncSession, query: str, category: Optional[WeavrWisdomCategory] = None) -> list[
     Type[WeavrWisdom]]:
     """
     Search the Weavr Wisdom knowledge base by keyword and optionally filter by category.
     """
-    search_query = db.query(WeavrWisdom).filter(WeavrWisdom.content.ilike(f"%{query}%"))
+    search_query = select(WeavrWisdom).where(WeavrWisdom.content.ilike(f"%{query}%"))
     if category:
-        search_query = search_query.filter(WeavrWisdom.category == category)
-    return search_query.all()
+        search_query = search_query.where(WeavrWisdom.category == category)
+    return (await db.scalars(search_query)).all()
 
 
 # --- Connection Strength Calculation ---
-def calculate_connection_strength(db: Session, user1_id: int, user2_id: int) -> int:
+def _is_aligned_goal(goal: Goal) -> bool:
+    return goal.goal_type is not None and goal.goal_type.value in (GoalType.collaboration.value,
+                                                                   GoalType.mentorship.value)
+
+
+async def calculate_connection_strength(db: AsyncSession, user1_id: int, user2_id: int) -> int:
+    """
+    Connection strength between two users, served from the strength cache when possible.
+    """
+    strength = strength_cache.get(user1_id, user2_id)
+    if strength is None:
+        strength = await _compute_connection_strength(db, user1_id, user2_id)
+        strength_cache.set(user1_id, user2_id, strength)
+    return strength
+
+
+async def _compute_connection_strength(db: AsyncSession, user1_id: int, user2_id: int) -> int:
     """
     Calculate the connection strength between two users.
     """
     strength = 0
 
     # Shared Passions
-    user1_passions = {passion.id for passion in get_user_service(db, user1_id).passions}
-    user2_passions = {passion.id for passion in get_user_service(db, user2_id).passions}
+    user1_passions = set(await db.scalars(
+        select(user_passions.c.passion_id).where(user_passions.c.user_id == user1_id)))
+    user2_passions = dict((await db.execute(select(Passion.id, Passion.name).join(
+        user_passions, user_passions.c.passion_id == Passion.id).where(user_passions.c.user_id == user2_id))).all())
     shared_passions = len(user1_passions.intersection(user2_passions))
     strength += shared_passions * 2
 
     # Goal Alignment
-    user1_goals = get_goals_by_user_service(db, user1_id)
+    user1_goals = await get_goals_by_user_service(db, user1_id)
     for goal in user1_goals:
-        if goal.goal_type in (GoalType.collaboration, GoalType.mentorship):
-            for passion_name in user2_passions:
+        if _is_aligned_goal(goal):
+            for passion_name in user2_passions.values():
                 if passion_name.lower() in goal.description.lower():
                     strength += 3
 
     # Network Proximity -  Call the optimized function
-    strength += (5 - get_network_proximity(user1_id, user2_id, db))  # Higher proximity = lower degree
+    strength += (5 - await get_network_proximity(user1_id, user2_id, db))  # Higher proximity = lower degree
 
     # Activity & Engagement (add more factors as needed)
-    user1_group_ids = {membership.group_id for membership in get_group_memberships_by_user_service(db, user1_id)}
-    user2_group_ids = {membership.group_id for membership in get_group_memberships_by_user_service(db, user2_id)}
+    user1_group_ids = {membership.group_id for membership in await get_group_memberships_by_user_service(db, user1_id)}
+    user2_group_ids = {membership.group_id for membership in await get_group_memberships_by_user_service(db, user2_id)}
     shared_group_ids = len(user1_group_ids.intersection(user2_group_ids))
     strength += shared_group_ids * 2
 
-    return min(strength, 5)  # Cap the strength at 5
+    return max(0, min(strength, 5))  # Clamp the strength to 0-5; unreachable users have proximity 999
 
 
-# --- Network Proximity (Optimized) ---
-def get_network_proximity(user1_id: int, user2_id: int, db: Session) -> int:
+def _bitsets(rows, bit_positions: Dict[int, int]) -> Dict[int, int]:
     """
-    Calculate network proximity using sets for efficiency.
-    Lower number means closer proximity.
-    Returns 999 if no connection is found within 3 degrees.
+    Fold (user_id, item_id) rows into one integer bitset per user, one bit per distinct item.
+    """
+    bitsets = defaultdict(int)
+    for user_id, item_id in rows:
+        bitsets[user_id] |= 1 << bit_positions.setdefault(item_id, len(bit_positions))
+    return bitsets
+
+
+async def calculate_connection_strength_batch(db: AsyncSession, user_id: int,
+                                              candidate_ids: List[int]) -> Dict[int, int]:
+    """
+    Connection strength between one user and many candidates. Cached pairs are served from the
+    strength cache; the rest are computed together and cached.
+    """
+    strengths = {}
+    missing_ids = []
+    for candidate_id in candidate_ids:
+        strength = strength_cache.get(user_id, candidate_id)
+        if strength is None:
+            missing_ids.append(candidate_id)
+        else:
+            strengths[candidate_id] = strength
+
+    if missing_ids:
+        computed = await _compute_connection_strength_batch(db, user_id, missing_ids)
+        for candidate_id, strength in computed.items():
+            strength_cache.set(user_id, candidate_id, strength)
+        strengths.update(computed)
+
+    return strengths
+
+
+async def _compute_connection_strength_batch(db: AsyncSession, user_id: int,
+                                             candidate_ids: List[int]) -> Dict[int, int]:
+    """
+    Calculate the connection strength between one user and many candidates in a fixed number of queries.
+    Passions and groups are loaded once as integer bitsets, so each component is an AND plus a popcount.
+    Returns the same clamped strength as calculate_connection_strength for every pair.
+    """
+    user_ids = [user_id, *candidate_ids]
+
+    passion_rows = (await db.execute(select(user_passions.c.user_id, Passion.id, Passion.name).join(
+        Passion, Passion.id == user_passions.c.passion_id).where(user_passions.c.user_id.in_(user_ids)))).all()
+    passion_bits = {}
+    passion_sets = _bitsets(((member_id, passion_id) for member_id, passion_id, _ in passion_rows), passion_bits)
+    group_sets = _bitsets((await db.execute(select(GroupMembership.user_id, GroupMembership.group_id).where(
+        GroupMembership.user_id.in_(user_ids)))).all(), {})
+
+    # Goal alignment: every aligned goal naming a passion adds 3, so weight each passion bit once
+    descriptions = [goal.description.lower() for goal in await get_goals_by_user_service(db, user_id)
+                    if _is_aligned_goal(goal)]
+    alignment_masks = defaultdict(int)
+    for _, passion_id, name in passion_rows:
+        weight = 3 * sum(1 for description in descriptions if name.lower() in description)
+        if weight:
+            alignment_masks[weight] |= 1 << passion_bits[passion_id]
+
+    proximities = await get_network_proximity_batch(db, user_id, candidate_ids)
+
+    user_passion_set = passion_sets.get(user_id, 0)
+    user_group_set = group_sets.get(user_id, 0)
+    strengths = {}
+    for candidate_id in candidate_ids:
+        candidate_passion_set = passion_sets.get(candidate_id, 0)
+        strength = (user_passion_set & candidate_passion_set).bit_count() * 2
+        strength += sum(weight * (candidate_passion_set & mask).bit_count()
+                        for weight, mask in alignment_masks.items())
+        strength += 5 - proximities[candidate_id]
+        strength += (user_group_set & group_sets.get(candidate_id, 0)).bit_count() * 2
+        strengths[candidate_id] = max(0, min(strength, 5))  # Clamp the strength to 0-5
+
+    return strengths
+
+
+async def compare_connection_strength_paths(db: AsyncSession, user_id: int,
+                                            candidate_ids: List[int]) -> Dict[int, Tuple[int, int]]:
+    """
+    Compute strengths from user_id to each candidate with both the per-pair and the batch path, bypassing
+    the cache, and return the candidates where they disagree as {candidate_id: (scalar, batch)}.
+    """
+    batch = await _compute_connection_strength_batch(db, user_id, candidate_ids)
+    mismatches = {}
+    for candidate_id in candidate_ids:
+        scalar = await _compute_connection_strength(db, user_id, candidate_id)
+        if scalar != batch[candidate_id]:
+            mismatches[candidate_id] = (scalar, batch[candidate_id])
+    return mismatches
+
+
+# --- Network Proximity ---
+async def _proximity_graph(db: AsyncSession):
+    """
+    Graph source for the configured PROXIMITY_BACKEND, or None to query the database directly.
+    The snapshot backend falls back to the database until a snapshot has been built.
     """
+    if settings.PROXIMITY_BACKEND == "snapshot":
+        return current_snapshot()
+    if settings.PROXIMITY_BACKEND == "index":
+        if not adjacency_index.loaded:
+            await adjacency_index.load(db)
+        return adjacency_index
+    return None
 
-    # 1st-Degree Connection
-    if get_connection(db, user1_id, user2_id) is not None:
-        return 1
 
-    # Get all connection IDs for both users
-    user1_connections = {conn.connected_user_id for conn in get_connections_for_user_service(db, user1_id)}
-    user2_connections = {conn.connected_user_id for conn in get_connections_for_user_service(db, user2_id)}
+async def get_network_proximity(user1_id: int, user2_id: int, db: AsyncSession) -> int:
+    """
+    Calculate network proximity with the configured PROXIMITY_BACKEND: a bidirectional BFS over
+    the in-memory adjacency index or the shared CSR snapshot, or one query expanding a depth per CTE.
+    Lower number means closer proximity.
+    Returns 999 if no connection is found within PROXIMITY_MAX_DEPTH degrees (PROXIMITY_CTE_MAX_DEPTH for "cte").
+    """
+    graph = await _proximity_graph(db)
+    if graph is None:
+        degree = await get_degree_of_separation(db, user1_id, user2_id, settings.PROXIMITY_CTE_MAX_DEPTH)
+    else:
+        degree = graph.degree_of_separation(user1_id, user2_id, settings.PROXIMITY_MAX_DEPTH)
+
+    return degree if degree is not None else 999  # Not connected within the depth limit
 
-    # 2nd-Degree Connection (mutual connection)
-    if user1_connections.intersection(user2_connections):
-        return 2
 
-    # 3rd-Degree Connection (connection of a connection)
-    for intermediate_user in user1_connections:
-        intermediate_connections = {conn.connected_user_id for conn in
-                                    get_connections_for_user_service(db, intermediate_user)}
-        if user2_id in intermediate_connections:
-            return 3
+async def get_network_proximity_batch(db: AsyncSession, user_id: int, candidate_ids: List[int]) -> Dict[int, int]:
+    """
+    Network proximity from one user to many candidates, expanding the user's neighbourhood once.
+    Uses the same backend and 999 sentinel as get_network_proximity.
+    """
+    graph = await _proximity_graph(db)
+    if graph is None:
+        degrees = await get_degrees_of_separation(db, user_id, candidate_ids, settings.PROXIMITY_CTE_MAX_DEPTH)
+    else:
+        degrees = graph.degrees_of_separation(user_id, candidate_ids, settings.PROXIMITY_MAX_DEPTH)
 
-    return 999  # Not connected within 3 degrees
+    return {candidate_id: degrees.get(candidate_id, 999) for candidate_id in candidate_ids}
 
 
 # --- Gamification & User Engagement Services ---
 
-def award_badge_service(db: Session, user_id: int, badge_name: str) -> Badge:
+async def award_badge_service(db: AsyncSession, user_id: int, badge_name: str) -> Badge:
     """
     Awards a badge to a user.
     """
-    badge = db.query(Badge).filter(Badge.name == badge_name).first()
+    badge = await db.scalar(select(Badge).where(Badge.name == badge_name))
     if not badge:
         raise ValueError(f"Badge with name '{badge_name}' not found.")
 
-    user = get_user_service(db, user_id)
+    user = await db.scalar(select(User).options(selectinload(User.badges)).where(User.id == user_id))
     user.badges.append(badge)
-    db.commit()
+    await db.commit()
     return badge
 
 
-def get_user_rank_service(db: Session, user_id: int, leaderboard_id: int) -> Optional[int]:
+async def get_user_rank_service(db: AsyncSession, user_id: int, leaderboard_id: int) -> Optional[int]:
     """
     Get the rank of a user on a specific leaderboard.
     """
-    entry = db.query(LeaderboardEntry).filter(
+    entry = await db.scalar(select(LeaderboardEntry).where(
         LeaderboardEntry.leaderboard_id == leaderboard_id,
         LeaderboardEntry.user_id == user_id
-    ).first()
+    ))
     return entry.rank if entry else None
 
 
-def update_leaderboard_service(db: Session, leaderboard_name: str) -> Leaderboard:
+async def update_leaderboard_service(db: AsyncSession, leaderboard_name: str) -> Leaderboard:
     """
     Update the leaderboard by recalculating scores and ranks.
     """
-    leaderboard = get_leaderboard_service(db, leaderboard_name)
-    entries = get_leaderboard_entries_by_leaderboard_service(db, leaderboard.id)
+    leaderboard = await get_leaderboard_service(db, leaderboard_name)
+    entries = await get_leaderboard_entries_by_leaderboard_service(db, leaderboard.id)
 
+    scores = await calculate_leaderboard_scores(db, [entry.user_id for entry in entries], leaderboard.criteria)
     for entry in entries:
-        entry.score = calculate_leaderboard_score(db, entry.user_id, leaderboard.criteria)
+        entry.score = scores[entry.user_id]
 
     entries.sort(key=lambda x: x.score, reverse=True)
     for rank, entry in enumerate(entries, start=1):
         entry.rank = rank
 
-    db.commit()
+    await db.commit()
     return leaderboard
 
 
-def calculate_leaderboard_score(db: Session, user_id: int, criteria: str) -> int:
+async def calculate_leaderboard_scores(db: AsyncSession, user_ids: List[int], criteria: str) -> Dict[int, int]:
     """
-    Calculate a user's score for a leaderboard based on the defined criteria.
+    Calculate leaderboard scores for many users with grouped COUNT queries, instead of loading
+    each user's connections and introductions.
     """
+    accepted = Introduction.status == IntroductionStatus.accepted
     if criteria == "Weavr Reputation":
         # Example: Base score on number of connections + bonus for intro success
-        user = get_user_service(db, user_id)
-        score = len(user.connections)
-        score += sum(1 for intro in user.introductions_made if intro.status == IntroductionStatus.accepted)
-        return score
+        counts = [
+            select(Connection.user_id, func.count()).where(Connection.user_id.in_(user_ids))
+            .group_by(Connection.user_id),
+            select(Introduction.introducer_id, func.count()).where(Introduction.introducer_id.in_(user_ids), accepted)
+            .group_by(Introduction.introducer_id),
+        ]
     elif criteria == "Introductions Made":
-        # Example: Score based on number of accepted introductions
-        return len([intro for intro in get_introductions_by_user_service(db, user_id) if
-                    intro.status == IntroductionStatus.accepted])
+        # Example: Score based on number of accepted introductions the user took part in
+        counts = [
+            select(Introduction.introducer_id, func.count()).where(Introduction.introducer_id.in_(user_ids), accepted)
+            .group_by(Introduction.introducer_id),
+            select(Introduction.target_user_id, func.count()).where(
+                Introduction.target_user_id.in_(user_ids), Introduction.introducer_id != Introduction.target_user_id,
+                accepted,
+            ).group_by(Introduction.target_user_id),
+        ]
     else:
         raise ValueError(f"Unsupported leaderboard criteria: {criteria}")
 
+    scores = dict.fromkeys(user_ids, 0)
+    if user_ids:
+        for query in counts:
+            for user_id, count in (await db.execute(query)).all():
+                scores[user_id] += count
+    return scores
+
 
-def get_user_streak(db: Session, user_id: int) -> int:
+async def calculate_leaderboard_score(db: AsyncSession, user_id: int, criteria: str) -> int:
+    """
+    Calculate a user's score for a leaderboard based on the defined criteria.
+    """
+    return (await calculate_leaderboard_scores(db, [user_id], criteria))[user_id]
+
+
+async def get_user_streak(db: AsyncSession, user_id: int) -> int:
     today = date.today()
-    activities = db.query(UserActivity).filter(UserActivity.user_id == user_id).order_by(UserActivity.date.desc()).all()
+    activities = (await db.scalars(select(UserActivity).where(UserActivity.user_id == user_id).order_by(
+        UserActivity.date.desc()))).all()
 
     streak = 0
     for activity in activities:
@@ -595,49 +877,77 @@ def get_user_streak(db: Session, user_id: int) -> int:
     return streak
 
 
-def update_user_streak(db: Session, user_id: int) -> int:
+async def update_user_streak(db: AsyncSession, user_id: int) -> int:
     today = date.today()
-    last_activity = db.query(UserActivity).filter(UserActivity.user_id == user_id).order_by(
-        UserActivity.date.desc()).first()
+    last_activity = await db.scalar(select(UserActivity).where(UserActivity.user_id == user_id).order_by(
+        UserActivity.date.desc()).limit(1))
 
     if last_activity and last_activity.date == today:
-        return get_user_streak(db, user_id)
+        return await get_user_streak(db, user_id)
 
     new_activity = UserActivity(user_id=user_id, date=today)
     db.add(new_activity)
-    db.commit()
-    return get_user_streak(db, user_id)
+    await db.commit()
+    return await get_user_streak(db, user_id)
 
 
-def award_points_for_action(db: Session, user_id: int, action_type: str, points: int):
+async def award_points_for_action(db: AsyncSession, user_id: int, action_type: str, points: int):
     today = date.today()
     new_points = UserPoints(user_id=user_id, action_type=action_type, points=points, date=today)
     db.add(new_points)
-    db.commit()
+    await db.commit()
 
 
-def get_suggested_connections_service(db: Session, user_id: int, limit: int = 5) -> List[User]:
+# Suggestion score weights: shared passion or matching goal, shared group, mutual connection
+SUGGESTION_PASSION_WEIGHT = 2
+SUGGESTION_GROUP_WEIGHT = 2
+SUGGESTION_MUTUAL_WEIGHT = 1
+
+
+async def get_suggested_connections_service(db: AsyncSession, user_id: int, limit: int = 5) -> List[User]:
     """
-    Get a list of suggested connections for a user based on shared passions and goals.
+    Get a ranked list of suggested connections for a user, scored by shared passions, passions matching
+    the user's collaboration/mentorship goals, shared groups and mutual connections in one grouped query.
+    Existing connections are excluded in SQL, and ORDER BY score + LIMIT lets the database keep a bounded
+    top-k heap. Ties break on user id, so the order is deterministic.
     """
-    user = get_user_service(db, user_id)
+    user = await get_user_service(db, user_id)
     if not user:
         raise ValueError(f"User with ID {user_id} not found.")
 
-    # Get all users with shared passions
-    shared_passion_users = set()
-    for passion in user.passions:
-        shared_passion_users.update(get_users_by_passion(db, passion.name))
-
-    # Get all users with shared goals
-    shared_goal_users = set()
-    for goal in user.goals:
-        if goal.goal_type in (GoalType.collaboration, GoalType.mentorship):
-            shared_goal_users.update(get_users_by_passion(db, goal.description))
-
-    # Combine and filter out existing connections
-    suggested_users = shared_passion_users.union(shared_goal_users) - {user}
-    existing_connections = {conn.connected_user_id for conn in get_connections_for_user_service(db, user_id)}
-    suggested_users = [suggested_user for suggested_user in suggested_users if suggested_user.id not in existing_connections]
-
-    return suggested_users[:limit]
\ No newline at end of file
+    own_passion_ids = select(user_passions.c.passion_id).where(user_passions.c.user_id == user_id)
+    own_group_ids = select(GroupMembership.group_id).where(GroupMembership.user_id == user_id)
+    goal_passion_ids = select(Passion.id).join(Goal, Goal.description == Passion.name).where(
+        Goal.user_id == user_id,
+        Goal.goal_type.in_([GoalType.collaboration.value, GoalType.mentorship.value]),
+    )
+    scores = union_all(
+        select(user_passions.c.user_id.label("candidate_id"),
+               literal(SUGGESTION_PASSION_WEIGHT, Integer).label("score"))
+        .where(user_passions.c.passion_id.in_(own_passion_ids)),
+        select(user_passions.c.user_id, literal(SUGGESTION_PASSION_WEIGHT, Integer))
+        .where(user_passions.c.passion_id.in_(goal_passion_ids)),
+        select(GroupMembership.user_id, literal(SUGGESTION_GROUP_WEIGHT, Integer))
+        .where(GroupMembership.group_id.in_(own_group_ids)),
+        select(MutualConnection.user_b, MutualConnection.count * SUGGESTION_MUTUAL_WEIGHT)
+        .where(MutualConnection.user_a == user_id),
+        select(MutualConnection.user_a, MutualConnection.count * SUGGESTION_MUTUAL_WEIGHT)
+        .where(MutualConnection.user_b == user_id),
+    ).subquery()
+
+    score = func.sum(scores.c.score).label("score")
+    ranked = (
+        select(scores.c.candidate_id, score)
+        .where(
+            scores.c.candidate_id != user_id,
+            scores.c.candidate_id.not_in(select(Connection.connected_user_id).where(Connection.user_id == user_id)),
+            scores.c.candidate_id.not_in(select(Connection.user_id).where(Connection.connected_user_id == user_id)),
+        )
+        .group_by(scores.c.candidate_id)
+        .order_by(score.desc(), scores.c.candidate_id)
+        .limit(limit)
+        .subquery()
+    )
+
+    return (await db.scalars(select(User).join(ranked, ranked.c.candidate_id == User.id).order_by(
+        ranked.c.score.desc(), User.id))).all()
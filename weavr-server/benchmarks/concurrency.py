@@ -0,0 +1,89 @@
+"""
+Concurrency benchmark for a running Weavr server.
+
+Fires GET requests at a fixed set of read endpoints from a pool of client threads and reports
+throughput and latency percentiles per concurrency level. Responses of 500 and above count as errors.
+
+    uvicorn main:app --workers 1 &
+    python benchmarks/concurrency.py --base-url http://127.0.0.1:8000 --user-id 1 --concurrency 1 16 64
+
+Recorded against one uvicorn worker on SQLite, with the audit-queries --seed-users 50 data set and
+1000 requests per level:
+
+     conc     req/s   mean ms    p50 ms    p95 ms    p99 ms  errors
+        1     126.2       7.8       6.1      13.3      22.7       0
+       16     152.3     104.3     101.7     143.4     175.1       0
+       64     144.4     433.8     428.1     740.0    1018.8       0
+
+The tree before the async port has no baseline to compare with. Its routes called the sync Query
+API on the AsyncSession from get_db, so every one of these endpoints returned 500.
+"""
+import argparse
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ENDPOINTS = [
+    "/users/{user_id}",
+    "/users/{user_id}/goals",
+    "/users/{user_id}/connections",
+    "/users/{user_id}/network/suggested_connections",
+    "/posts/",
+]
+
+
+def _fetch(url: str, timeout: float) -> tuple[float, bool]:
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            ok = response.status < 500
+    except urllib.error.HTTPError as e:
+        ok = e.code < 500
+    except (urllib.error.URLError, TimeoutError):
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def _percentile(latencies: list[float], percent: float) -> float:
+    index = min(len(latencies) - 1, int(round(percent / 100 * (len(latencies) - 1))))
+    return latencies[index]
+
+
+def run(base_url: str, user_id: int, concurrency: int, requests: int, timeout: float) -> dict:
+    urls = [base_url.rstrip("/") + ENDPOINTS[i % len(ENDPOINTS)].format(user_id=user_id) for i in range(requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda url: _fetch(url, timeout), urls))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": sum(1 for _, ok in results if not ok),
+        "throughput": requests / elapsed,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Weavr concurrency benchmark.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per concurrency level.")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    _fetch(args.base_url.rstrip("/") + ENDPOINTS[0].format(user_id=args.user_id), args.timeout)  # Warm up
+    print(f"{'conc':>5} {'req/s':>9} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for level in args.concurrency:
+        result = run(args.base_url, args.user_id, level, args.requests, args.timeout)
+        print(f"{result['concurrency']:>5} {result['throughput']:>9.1f} {result['mean_ms']:>9.1f} "
+              f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['errors']:>7}")
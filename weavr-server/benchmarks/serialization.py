@@ -0,0 +1,148 @@
+"""
+List response serialization benchmark.
+
+Compares the response_model path (ORM objects validated into schemas and encoded by FastAPI) with
+the fast path (Core rows mapped by a RowSerializer and encoded by app.serializers.dumps) for the
+/posts/, /users/{id}/notifications and /conversations/... pages. Run from weavr-server:
+
+    python -m benchmarks.serialization --rows 100 --repeat 200
+    python -m benchmarks.serialization --from-db --user-id 1 --other-user-id 2
+
+Without --from-db, rows are synthetic and only serialization is measured. With --from-db, each
+iteration also runs the page query against DATABASE_URL, so ORM hydration is included.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app import schemas
+from app.database import async_session
+from app.models import Message, Notification, Post
+from app.serializers import MESSAGE_SERIALIZER, NOTIFICATION_SERIALIZER, POST_SERIALIZER, dumps, orjson
+from app.services import get_all_posts_service, get_conversation_service, get_notifications_for_user_service
+
+CASES = {
+    "posts": (Post, schemas.Post, POST_SERIALIZER),
+    "notifications": (Notification, schemas.Notification, NOTIFICATION_SERIALIZER),
+    "conversation": (Message, schemas.Message, MESSAGE_SERIALIZER),
+}
+
+
+def _with_schema_names(model, objects: list) -> list:
+    # schemas.Message reads created_at, but the Message table names it sent_at, so the response_model
+    # route could not serialize a message at all (500). Copy the value over so the model path is timed
+    # as if it worked; the fast path maps sent_at to created_at in MESSAGE_SERIALIZER.
+    if model is Message:
+        for message in objects:
+            message.created_at = message.sent_at
+    return objects
+
+
+def _response_model_body(adapter: TypeAdapter, items: list) -> bytes:
+    # What FastAPI does for response_model=List[...]: validate, convert to JSON types, encode
+    content = jsonable_encoder(adapter.dump_python(adapter.validate_python(items, from_attributes=True)))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def _synthetic_rows(serializer, rows: int) -> List[tuple]:
+    now = datetime.utcnow()
+    samples = []
+    for n in range(rows):
+        row = []
+        for column in serializer.columns:
+            python_type = column.type.python_type
+            if python_type is datetime:
+                row.append(now - timedelta(seconds=n))
+            elif python_type is bool:
+                row.append(n % 2 == 0)
+            elif python_type is int:
+                row.append(n + 1)
+            else:
+                row.append(f"benchmark row {n} " * 4)
+        samples.append(tuple(row))
+    return samples
+
+
+def _timed(fn, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def _timed_async(fn, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_synthetic(rows: int, repeat: int) -> dict:
+    results = {}
+    for name, (model, schema, serializer) in CASES.items():
+        samples = _synthetic_rows(serializer, rows)
+        columns = [column.key for column in serializer.columns]
+        objects = _with_schema_names(model, [model(**dict(zip(columns, row))) for row in samples])
+        adapter = TypeAdapter(List[schema])
+        results[name] = (
+            _timed(lambda: _response_model_body(adapter, objects), repeat),
+            _timed(lambda: dumps(serializer.serialize(samples)), repeat),
+        )
+    return results
+
+
+async def run_from_db(rows: int, repeat: int, user_id: int, other_user_id: int) -> dict:
+    queries = {
+        "posts": lambda db, columns: get_all_posts_service(db, 0, rows, None, columns),
+        "notifications": lambda db, columns: get_notifications_for_user_service(db, user_id, 0, rows, None, columns),
+        "conversation": lambda db, columns: get_conversation_service(db, user_id, other_user_id, 0, rows, None,
+                                                                     columns),
+    }
+    results = {}
+    async with async_session() as db:
+        for name, (model, schema, serializer) in CASES.items():
+            adapter = TypeAdapter(List[schema])
+
+            async def current():
+                page = await queries[name](db, None)
+                _response_model_body(adapter, _with_schema_names(model, page.items))
+                db.expunge_all()  # Hydrate fresh objects every iteration, as a new request would
+
+            async def fast():
+                page = await queries[name](db, serializer.columns)
+                dumps(serializer.serialize(page.items))
+
+            results[name] = (await _timed_async(current, repeat), await _timed_async(fast, repeat))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Weavr list serialization benchmark.")
+    parser.add_argument("--rows", type=int, default=100, help="Rows per page.")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--from-db", action="store_true", help="Include the page query against DATABASE_URL.")
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--other-user-id", type=int, default=2)
+    args = parser.parse_args()
+
+    if args.from_db:
+        results = asyncio.run(run_from_db(args.rows, args.repeat, args.user_id, args.other_user_id))
+    else:
+        results = run_synthetic(args.rows, args.repeat)
+
+    print(f"encoder: {'orjson' if orjson is not None else 'json'}")
+    print(f"{'page':<14} {'model ms':>9} {'fast ms':>9} {'speedup':>8}")
+    for name, (current, fast) in results.items():
+        current_ms, fast_ms = statistics.median(current) * 1000, statistics.median(fast) * 1000
+        print(f"{name:<14} {current_ms:>9.3f} {fast_ms:>9.3f} {current_ms / fast_ms:>7.1f}x")
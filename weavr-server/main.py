@@ -1,9 +1,12 @@
 import logging
+import time
 
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 
-from app.create_tables import create_database
+from app.config import settings
+from app.create_tables import check_schema_version, create_database
+from app.database import pool_stats
 from app.routers import router
 
 app = FastAPI()
@@ -17,12 +20,18 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 async def on_startup():
+    start = time.perf_counter()
     try:
-        await create_database()
-        logger.info("Database created successfully.")
+        if settings.SCHEMA_STARTUP_MODE == "create":
+            await create_database()
+            logger.info("Database created successfully.")
+        else:
+            await check_schema_version()
+            logger.info("Database schema version verified.")
     except Exception as e:
-        logger.error(f"Error creating database: {e}")
+        logger.error(f"Error preparing database: {e}")
         raise
+    logger.info(f"Startup completed in {(time.perf_counter() - start) * 1000:.1f} ms.")
 
 
 @app.on_event("shutdown")
@@ -35,6 +44,11 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/db_pool", response_class=JSONResponse)
+async def db_pool_health():
+    return pool_stats()
+
+
 # Include router
 app.include_router(router)
 